@@ -0,0 +1,153 @@
+import asyncio
+import json
+import time
+from collections import deque
+import discord
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+audit_log_queue_size = config.get("audit_log_queue_size", 1000)
+audit_log_interval = config.get("audit_log_interval", 2)
+audit_log_spill_path = config.get("audit_log_spill_path", "audit_log_spill.jsonl")
+
+# Discord's limits for one message
+MAX_EMBEDS = 10
+MAX_DESCRIPTION = 4096
+MAX_MESSAGE_CHARS = 6000
+
+class AuditLog:
+    """Background sink for the log channel.
+
+    ``record`` and ``record_embed`` only queue the event, so commands never
+    wait on Discord. ``run`` sends whatever has built up every ``interval``
+    seconds as one message: plain events are packed as lines into a single
+    embed, report embeds ride along, up to Discord's per-message limits.
+    Rate limits and server errors put the batch back and back off. Events
+    that do not fit in the queue, or cannot be sent at all, are appended to
+    ``spill_path`` as JSON lines instead of being lost.
+    """
+
+    def __init__(self, max_queue=1000, interval=2, spill_path="audit_log_spill.jsonl"):
+        self.max_queue = max_queue
+        self.interval = interval
+        self.spill_path = spill_path
+        self.queue = deque()
+        self.spilled = 0
+        self._wakeup = asyncio.Event()
+
+    def record(self, text):
+        self._put((time.time(), text))
+
+    def record_embed(self, embed):
+        self._put((time.time(), embed))
+
+    def _put(self, event):
+        if len(self.queue) >= self.max_queue:
+            self._spill([event])
+            return
+        self.queue.append(event)
+        self._wakeup.set()
+
+    def _spill(self, events):
+        try:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for timestamp, item in events:
+                    entry = {"time": timestamp}
+                    if isinstance(item, discord.Embed):
+                        entry["embed"] = item.to_dict()
+                    else:
+                        entry["text"] = item
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Failed to spill {len(events)} audit events to {self.spill_path}: {e}")
+            return
+        self.spilled += len(events)
+
+    def _next_batch(self):
+        """Take events off the queue for one message; returns ``(events, embeds)``."""
+        events, embeds, lines = [], [], []
+        description_length = 0
+        chars = len("Audit Log")
+        while self.queue:
+            timestamp, item = self.queue[0]
+            if isinstance(item, discord.Embed):
+                size = len(item)
+                full = len(embeds) + 1 + (1 if lines else 0) > MAX_EMBEDS
+            else:
+                item = f"<t:{int(timestamp)}:T> {item}"[:1000]
+                size = len(item) + 1
+                full = (not lines and len(embeds) + 1 > MAX_EMBEDS) or description_length + size > MAX_DESCRIPTION
+            if events and (full or chars + size > MAX_MESSAGE_CHARS):
+                break
+            if isinstance(item, discord.Embed):
+                embeds.append(item)
+            else:
+                lines.append(item)
+                description_length += size
+            chars += size
+            events.append(self.queue.popleft())
+        if lines:
+            embeds.insert(0, discord.Embed(title="Audit Log", description="\n".join(lines), color=discord.Color.blue()))
+        return events, embeds
+
+    async def run(self, get_channel):
+        backoff = self.interval
+        while True:
+            if not self.queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Let a burst of events build up so it goes out as one message
+            await asyncio.sleep(self.interval)
+
+            channel = get_channel()
+            if channel is None:
+                events = list(self.queue)
+                self.queue.clear()
+                self._spill(events)
+                continue
+
+            while self.queue:
+                events, embeds = self._next_batch()
+                try:
+                    await channel.send(embeds=embeds)
+                except discord.RateLimited as e:
+                    self.queue.extendleft(reversed(events))
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                except discord.HTTPException as e:
+                    if e.status != 429 and e.status < 500:
+                        # Retrying a rejected message would only fail again
+                        print(f"Audit log message rejected ({e.status}): {e}")
+                        self._spill(events)
+                        continue
+                    error = e
+                except Exception as e:
+                    error = e
+                else:
+                    backoff = self.interval
+                    if self.queue:
+                        await asyncio.sleep(self.interval)
+                    continue
+
+                self.queue.extendleft(reversed(events))
+                print(f"Audit log send failed ({error}), retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 300)
+
+    def close(self):
+        if self.queue:
+            self._spill(list(self.queue))
+            self.queue.clear()
+
+audit_log = AuditLog(max_queue=audit_log_queue_size, interval=audit_log_interval, spill_path=audit_log_spill_path)
+
+async def log_command(interaction, command_name, args):
+    # Queued for the background sender; never waits on Discord
+    text = f"{interaction.user.mention} used `/{command_name}`"
+    if args:
+        text += " " + (", ".join(f"{key}={value}" for key, value in args.items()) if isinstance(args, dict) else str(args))
+    if interaction.channel is not None:
+        text += f" in {interaction.channel.mention}"
+    audit_log.record(text)
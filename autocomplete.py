@@ -0,0 +1,27 @@
+from discord import app_commands
+from rcon_pool import servers
+from ban_store import ban_store
+from snapshot_cache import snapshot_cache
+from name_index import PrefixIndex
+
+# Discord shows at most 25 suggestions and rejects values over 100 characters
+MAX_CHOICES = 25
+MAX_CHOICE_LENGTH = 100
+
+server_names = PrefixIndex(servers)
+
+def choices(names):
+    return [app_commands.Choice(name=name, value=name) for name in names if len(name) <= MAX_CHOICE_LENGTH][:MAX_CHOICES]
+
+async def server_name_autocomplete(interaction, current):
+    return choices(server_names.search(current, MAX_CHOICES))
+
+async def banned_name_autocomplete(interaction, current):
+    return choices(ban_store.names.search(current, MAX_CHOICES))
+
+async def online_player_autocomplete(interaction, current):
+    # Narrow to the chosen server once one is filled in; its last player list is the best guess
+    server_name = getattr(interaction.namespace, 'server_name', None)
+    if server_name not in servers:
+        server_name = None
+    return choices(snapshot_cache.online.search(current, server_name, MAX_CHOICES))
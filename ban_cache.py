@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+from github_client import github, GitHubError, decode_ban_file, update_github_file, READ, WRITE
+from ban_shards import ShardedBanCache
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+repo_url = f'https://api.github.com/repos/{config["github_username"]}/{config["repo_name"]}'
+api_url = f'{repo_url}/contents/{config["file_path"]}'
+ban_shard_count = config.get("ban_shard_count", 0)
+ban_shard_dir = config.get("ban_shard_dir", f'{os.path.splitext(config["file_path"])[0]}_shards')
+github_branch = config.get("github_branch")
+
+class BanCache:
+    """In-memory copy of the GitHub ban file, revalidated with ETags.
+
+    ``refresh`` sends ``If-None-Match`` so an unchanged file costs a 304 and
+    no decode. Writes made by the bot go through ``apply`` so the cache never
+    has to re-download what it just wrote. This is GitHub's view of the ban
+    list; the bot itself reads from the local ban store.
+    """
+
+    def __init__(self, api_url):
+        self.api_url = api_url
+        self.bans = {}
+        self.sha = None
+        self.etag = None
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def refresh(self, priority=READ):
+        """Revalidate against GitHub; return True if the ban list changed."""
+        headers = {'If-None-Match': self.etag} if self.etag and self.loaded else {}
+        status, response_headers, data = await github.request('GET', self.api_url, priority=priority, headers=headers)
+        if status == 304:
+            return False
+        if status != 200:
+            raise GitHubError(f"Failed to retrieve data from GitHub API. Status code: {status}", status)
+
+        self.etag = response_headers.get('ETag')
+        sha = data.get('sha', '') if isinstance(data, dict) else ''
+        if self.loaded and sha and sha == self.sha:
+            # Our own last write; the content is already in memory
+            return False
+        self.bans = decode_ban_file(data)
+        self.sha = sha
+        self.loaded = True
+        return True
+
+    def apply(self, bans, sha):
+        self.bans = bans
+        self.sha = sha
+        self.loaded = True
+
+    async def _load(self):
+        try:
+            # Part of a write, so it queues with the writes
+            changed = await self.refresh(priority=WRITE)
+        except GitHubError as e:
+            if e.status not in (200, 404):
+                raise
+            # Missing or unreadable file: start a fresh one like before
+            return {}, None, False
+        return dict(self.bans), self.sha, changed
+
+    async def commit(self, changes, commit_message, max_attempts=5):
+        """Write ``{username: details}`` (``None`` deletes) to the file, re-reading it on a sha conflict.
+
+        Returns True if the read before the write found edits made on GitHub;
+        ``bans`` then holds them and the caller should merge them.
+        """
+        attempt = 1
+        remote_changed = False
+        while True:
+            bans, sha, changed = await self._load()
+            remote_changed = remote_changed or changed
+            updated = dict(bans)
+            for username, details in changes.items():
+                if details is None:
+                    updated.pop(username, None)
+                else:
+                    updated[username] = details
+            if sha is not None and updated == bans:
+                return remote_changed
+
+            try:
+                new_sha = await update_github_file(self.api_url, updated, commit_message, sha)
+            except GitHubError as e:
+                if e.status == 409 and attempt < max_attempts:
+                    print(f"Ban file changed while writing, retrying ({attempt}/{max_attempts})")
+                    attempt += 1
+                    continue
+                raise
+            self.apply(updated, new_sha)
+            return remote_changed
+
+    def get(self, username):
+        return self.bans.get(username)
+
+if ban_shard_count:
+    ban_cache = ShardedBanCache(repo_url, ban_shard_dir, ban_shard_count, branch=github_branch)
+else:
+    ban_cache = BanCache(api_url)
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+from datetime import date
+from ban_index import classify, INVALID, TIMED
+
+MAX_USERNAME_LENGTH = 64
+USERNAME_COLUMNS = ('username', 'name', 'player', 'uniqueid', 'unique_id')
+DATE_COLUMNS = ('banneduntil', 'date', 'until', 'expires')
+REASON_COLUMNS = ('banreason', 'reason')
+
+class BanImport:
+    """Entries read from one bulk ban message or attachment.
+
+    ``accepted`` maps usernames to ban details in the ban file's own format,
+    ready for a single ``ban_store.apply``; ``rejected`` lists
+    ``(row, username, reason)`` for every entry that failed validation.
+    """
+
+    __slots__ = ("accepted", "rejected", "rows")
+
+    def __init__(self):
+        self.accepted = {}
+        self.rejected = []
+        self.rows = {}
+
+    def add(self, row, username, banned_until, ban_reason, today=None):
+        username = (username or '').strip()
+        banned_until = (banned_until or '').strip()
+        ban_reason = (ban_reason or '').strip()
+        if not username:
+            self.rejected.append((row, username, "missing name"))
+            return
+        if len(username) > MAX_USERNAME_LENGTH or any(character in username for character in '\r\n\t'):
+            self.rejected.append((row, username, "not a valid player name"))
+            return
+        if not banned_until:
+            # The ban file reads a blank date as permanent; an import has to say so explicitly
+            self.rejected.append((row, username, "missing date (use a date, or 'perm' for a permanent ban)"))
+            return
+        if username in self.rows:
+            self.rejected.append((row, username, f"duplicate of row {self.rows[username]}"))
+            return
+        details = {'banneduntil': banned_until, 'BanReason': ban_reason or 'N/A'}
+        expiry, state = classify(details)
+        if state == INVALID:
+            self.rejected.append((row, username, f"unrecognised date '{banned_until}'"))
+            return
+        if state == TIMED and expiry <= (today or date.today()).isoformat():
+            self.rejected.append((row, username, f"ban already ended on {expiry}"))
+            return
+        self.rows[username] = row
+        self.accepted[username] = details
+
+    def summary(self):
+        return f"{len(self.accepted)} accepted, {len(self.rejected)} rejected"
+
+    def rejected_lines(self, limit=20):
+        lines = [f"Row {row} ({username or 'no name'}): {reason}" for row, username, reason in self.rejected[:limit]]
+        if len(self.rejected) > limit:
+            lines.append(f"...and {len(self.rejected) - limit} more")
+        return lines
+
+def parse_message(text):
+    """Read ``Name/Date/Reason`` triples, one after another or split by blank lines."""
+    ban_import = BanImport()
+    lines = [line.strip() for line in text.splitlines()]
+    blocks, block = [], []
+    for line in lines + ['']:
+        if line:
+            block.append(line)
+        elif block:
+            blocks.append(block)
+            block = []
+
+    row = 0
+    for block in blocks:
+        if len(block) % 3:
+            # Once the lines are out of step there is no telling which name goes with which date
+            row += 1
+            ban_import.rejected.append((row, block[0], f"{len(block)} lines do not split into Name, Date and Reason entries; separate entries with a blank line"))
+            continue
+        for i in range(0, len(block), 3):
+            row += 1
+            ban_import.add(row, *block[i:i + 3])
+    return ban_import
+
+def _column(fieldnames, candidates):
+    for fieldname in fieldnames:
+        if fieldname.strip().lower().replace(' ', '') in candidates:
+            return fieldname
+    return None
+
+def parse_csv(text):
+    """Read a CSV with name, date and reason columns, with or without a header."""
+    ban_import = BanImport()
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return ban_import
+    header = rows[0]
+    username_column = _column(header, USERNAME_COLUMNS)
+    if username_column is not None:
+        date_column = _column(header, DATE_COLUMNS)
+        reason_column = _column(header, REASON_COLUMNS)
+        indexes = [header.index(column) if column is not None else None for column in (username_column, date_column, reason_column)]
+        rows = rows[1:]
+        first_row = 2
+    else:
+        indexes = [0, 1, 2]
+        first_row = 1
+
+    for row, values in enumerate(rows, start=first_row):
+        if not any(value.strip() for value in values):
+            continue
+        fields = [values[index] if index is not None and index < len(values) else '' for index in indexes]
+        ban_import.add(row, *fields)
+    return ban_import
+
+def parse_json(text):
+    """Read either the ban file's own ``{name: {banneduntil, BanReason}}`` form or a list of rows."""
+    ban_import = BanImport()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        ban_import.rejected.append((0, '', f"not valid JSON: {e}"))
+        return ban_import
+
+    if isinstance(data, dict):
+        entries = [dict(details, username=username) if isinstance(details, dict) else {'username': username} for username, details in data.items()]
+    elif isinstance(data, list):
+        entries = data
+    else:
+        ban_import.rejected.append((0, '', "expected a JSON object or list"))
+        return ban_import
+
+    for row, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            ban_import.rejected.append((row, '', "not a JSON object"))
+            continue
+        fields = {key.lower().replace(' ', ''): value for key, value in entry.items()}
+        username = next((fields[key] for key in USERNAME_COLUMNS if key in fields), '')
+        banned_until = next((fields[key] for key in DATE_COLUMNS if key in fields), '')
+        ban_reason = next((fields[key] for key in REASON_COLUMNS if key in fields), '')
+        ban_import.add(row, *('' if value is None else str(value) for value in (username, banned_until, ban_reason)))
+    return ban_import
+
+def parse_attachment(filename, data):
+    text = data.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        return parse_json(text)
+    return parse_csv(text)
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%Y/%m/%d')
+PERMANENT_VALUES = {'', 'perm', 'permanent', 'never', 'forever', 'n/a'}
+
+# Ban states stored next to each entry so nothing has to be re-parsed later
+TIMED = 'timed'
+PERMANENT = 'permanent'
+INVALID = 'invalid'
+
+def parse_date(date_str):
+    if not isinstance(date_str, str):
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).date()
+        except ValueError:
+            pass
+    return None
+
+def classify(details):
+    """Return ``(expiry, state)`` for a ban entry, parsing its date once.
+
+    ``expiry`` is an ISO ``YYYY-MM-DD`` string, so it sorts and compares
+    correctly as text in the store's expiry index.
+    """
+    raw = details.get('banneduntil') if isinstance(details, dict) else None
+    banned_until = parse_date(raw)
+    if banned_until is not None:
+        return banned_until.isoformat(), TIMED
+    if raw is None or str(raw).strip().lower() in PERMANENT_VALUES:
+        return None, PERMANENT
+    return None, INVALID
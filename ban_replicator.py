@@ -0,0 +1,106 @@
+import asyncio
+import json
+from github_client import github, GitHubError, BACKGROUND
+from ban_cache import ban_cache
+from ban_store import ban_store
+from audit_log import audit_log
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+ban_refresh_interval = config.get("ban_refresh_interval", 60)
+ban_write_window = config.get("ban_write_window", 2)
+ban_write_attempts = config.get("ban_write_attempts", 5)
+ban_refresh_backoff = config.get("ban_refresh_backoff", 4)
+
+class BanReplicator:
+    """Keeps the GitHub ban list in step with the local ban store.
+
+    Local changes are pushed in batches: the replicator waits ``window``
+    seconds after the first change so everything queued meanwhile lands in a
+    single commit. The cache (one file, or shards) handles write conflicts.
+    Every ``interval`` seconds GitHub is revalidated (a 304 when unchanged)
+    and edits made directly there are merged into the store. If there is no
+    ban list on GitHub yet, the whole store is published.
+
+    Revalidation is background traffic: while GitHub's quota is held back for
+    writes the interval is stretched ``backoff`` times and the bot keeps
+    serving the ban list it already has. When replication starts failing,
+    and again when it recovers, the log channel is told, since bans are
+    confirmed to moderators as soon as they are stored locally.
+    """
+
+    def __init__(self, store, cache, interval=60, window=2, max_attempts=5, backoff=4):
+        self.store = store
+        self.cache = cache
+        self.interval = interval
+        self.window = window
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.failing = False
+        self._wakeup = asyncio.Event()
+        store.listeners.append(self._on_change)
+
+    def _on_change(self, local):
+        if local:
+            self._wakeup.set()
+
+    async def push(self):
+        last_id, changes, messages = self.store.pending()
+        if last_id is None:
+            return
+        if len(messages) == 1:
+            commit_message = messages[0]
+        else:
+            commit_message = f"{len(messages)} ban list changes\n\n" + "\n".join(messages)
+
+        async with self.cache.lock:
+            remote_changed = await self.cache.commit(changes, commit_message, self.max_attempts)
+        self.store.ack(last_id)
+        if remote_changed:
+            # The write was built on edits made on GitHub since the last pull; the next pull sees only our own commit
+            self.store.merge_remote(self.cache.bans)
+
+    async def pull(self):
+        async with self.cache.lock:
+            try:
+                changed = await self.cache.refresh(priority=BACKGROUND)
+            except GitHubError as e:
+                if e.status == 429 and github.limiter.low():
+                    # Quota is saved for writes; keep serving the cached list
+                    return False
+                if e.status != 404 or not self.store.bans:
+                    raise
+                # Nothing on GitHub yet, e.g. the first run with shards enabled
+                await self.cache.commit(dict(self.store.bans), f"Publish ban list ({len(self.store.bans)} bans)", self.max_attempts)
+                return False
+        if changed:
+            self.store.merge_remote(self.cache.bans)
+        return changed
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.push()
+                await self.pull()
+            except Exception as e:
+                print(f"Ban replication failed: {e}")
+                if not self.failing:
+                    self.failing = True
+                    audit_log.record(f"⚠️ Ban list changes could not be saved to GitHub ({e}); {self.store.pending_count()} change(s) are kept locally and will be retried")
+            else:
+                if self.failing:
+                    self.failing = False
+                    audit_log.record("✅ Ban list replication to GitHub has recovered")
+
+            interval = self.interval * self.backoff if github.limiter.low() else self.interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+                # Give changes arriving close together a chance to share a commit
+                await asyncio.sleep(self.window)
+            except asyncio.TimeoutError:
+                pass
+
+replicator = BanReplicator(ban_store, ban_cache, interval=ban_refresh_interval, window=ban_write_window, max_attempts=ban_write_attempts, backoff=ban_refresh_backoff)
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+from base64 import b64decode
+from github_client import github, GitHubError, READ, WRITE
+
+MAX_SHARDS = 256
+
+def blob_sha(data):
+    """The sha Git gives a blob with this content, so our own writes need no re-read."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def encode_shard(bans):
+    # Sorted so the same bans always give the same blob sha
+    return json.dumps(bans, indent=4, sort_keys=True) + "\n"
+
+class ShardedBanCache:
+    """GitHub's view of the ban list, split over ``shard_count`` files.
+
+    Each ban lives in ``<directory>/<nn>.json``, picked by a hash of the
+    username. ``refresh`` lists the directory (a 304 when nothing changed) and
+    downloads only the shards whose blob sha differs from the one in memory.
+    ``commit`` writes just the shards a batch touches, all in one Git commit
+    built from the current head; if the branch moved meanwhile it re-reads
+    the touched shards and tries again.
+    """
+
+    def __init__(self, repo_url, directory, shard_count, branch=None):
+        self.repo_url = repo_url
+        self.directory = directory.strip('/')
+        self.shard_count = max(1, min(shard_count, MAX_SHARDS))
+        self.branch = branch
+        self.shards = {}
+        self.shas = {}
+        self.bans = {}
+        self.etag = None
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self._width = len(f"{self.shard_count - 1:x}")
+
+    def shard_for(self, username):
+        index = int(hashlib.sha1(username.encode('utf-8')).hexdigest()[:8], 16) % self.shard_count
+        return f"{index:0{self._width}x}.json"
+
+    def get(self, username):
+        return self.bans.get(username)
+
+    async def _get(self, url, **kwargs):
+        status, headers, data = await github.request('GET', url, **kwargs)
+        if status != 200:
+            raise GitHubError(f"Failed to retrieve {url}. Status code: {status}", status)
+        return headers, data
+
+    async def _branch(self, priority=WRITE):
+        if self.branch is None:
+            _, repo = await self._get(self.repo_url, priority=priority)
+            self.branch = repo['default_branch']
+        return self.branch
+
+    def _listing(self, data):
+        if not isinstance(data, list):
+            raise GitHubError(f"{self.directory} is not a directory", 200)
+        return {entry['name']: entry['sha'] for entry in data if entry.get('type') == 'file' and entry['name'].endswith('.json')}
+
+    async def _fetch_shard(self, sha, priority=READ):
+        _, data = await self._get(f"{self.repo_url}/git/blobs/{sha}", priority=priority)
+        try:
+            content = b64decode(data['content']).decode('utf-8')
+            return json.loads(content) if content.strip() else {}
+        except (KeyError, ValueError) as e:
+            raise GitHubError(f"Unreadable ban shard {sha}: {e}", 200) from e
+
+    def _store_shard(self, name, bans, sha):
+        for username in self.shards.get(name, {}):
+            self.bans.pop(username, None)
+        if sha is None:
+            self.shards.pop(name, None)
+            self.shas.pop(name, None)
+            return
+        self.bans.update(bans)
+        self.shards[name] = bans
+        self.shas[name] = sha
+
+    async def _sync(self, listing, names, priority=READ):
+        """Bring the shards in ``names`` up to date with ``listing``; return True if any changed."""
+        stale = [name for name in names if self.shas.get(name) != listing.get(name)]
+        fetched = await asyncio.gather(*(self._fetch_shard(listing[name], priority) for name in stale if name in listing))
+        fetched = iter(fetched)
+        for name in stale:
+            if name in listing:
+                self._store_shard(name, next(fetched), listing[name])
+            else:
+                self._store_shard(name, {}, None)
+        return bool(stale)
+
+    async def refresh(self, priority=READ):
+        """Revalidate against GitHub; return True if the ban list changed."""
+        # Read the branch commit writes to, not the repository's default one
+        branch = await self._branch(priority)
+        headers = {'If-None-Match': self.etag} if self.etag and self.loaded else {}
+        url = f"{self.repo_url}/contents/{self.directory}"
+        status, response_headers, data = await github.request('GET', url, priority=priority, headers=headers, params={'ref': branch})
+        if status == 304:
+            return False
+        if status != 200:
+            raise GitHubError(f"Failed to list {self.directory} on GitHub. Status code: {status}", status)
+
+        listing = self._listing(data)
+        changed = await self._sync(listing, set(listing) | set(self.shas), priority)
+        self.etag = response_headers.get('ETag')
+        self.loaded = True
+        return changed
+
+    async def commit(self, changes, commit_message, max_attempts=5):
+        """Write ``{username: details}`` (``None`` deletes) as one commit touching only the affected shards.
+
+        Returns True if the shards read for the write had edits made on
+        GitHub; ``bans`` then holds them and the caller should merge them.
+        Before the first refresh every shard is read, so ``bans`` is whole.
+        """
+        branch = await self._branch()
+        touched = {}
+        for username, details in changes.items():
+            touched.setdefault(self.shard_for(username), {})[username] = details
+
+        attempt = 1
+        remote_changed = False
+        while True:
+            # The reads here are part of the write, so they queue with the writes
+            _, ref = await self._get(f"{self.repo_url}/git/ref/heads/{branch}", priority=WRITE)
+            head = ref['object']['sha']
+            _, head_commit = await self._get(f"{self.repo_url}/git/commits/{head}", priority=WRITE)
+
+            status, _, data = await github.request('GET', f"{self.repo_url}/contents/{self.directory}", priority=WRITE, params={'ref': head})
+            if status not in (200, 404):
+                raise GitHubError(f"Failed to list {self.directory} on GitHub. Status code: {status}", status)
+            listing = self._listing(data) if status == 200 else {}
+            names = set(touched) if self.loaded else set(listing) | set(self.shas) | set(touched)
+            remote_changed = await self._sync(listing, names, WRITE) or remote_changed
+
+            entries, written = [], {}
+            for name, shard_changes in touched.items():
+                current = self.shards.get(name, {})
+                updated = dict(current)
+                for username, details in shard_changes.items():
+                    if details is None:
+                        updated.pop(username, None)
+                    else:
+                        updated[username] = details
+                if updated == current and name in self.shas:
+                    continue
+                content = encode_shard(updated)
+                entries.append({"path": f"{self.directory}/{name}", "mode": "100644", "type": "blob", "content": content})
+                written[name] = (updated, blob_sha(content.encode('utf-8')))
+            if not entries:
+                self.loaded = True
+                return remote_changed
+
+            status, _, tree = await github.request('POST', f"{self.repo_url}/git/trees", json={"base_tree": head_commit['tree']['sha'], "tree": entries})
+            if status != 201:
+                raise GitHubError(f"Failed to create ban shard tree. Status code: {status}: {tree}", status)
+            status, _, new_commit = await github.request('POST', f"{self.repo_url}/git/commits", json={"message": commit_message, "tree": tree['sha'], "parents": [head]})
+            if status != 201:
+                raise GitHubError(f"Failed to create ban shard commit. Status code: {status}: {new_commit}", status)
+            status, _, data = await github.request('PATCH', f"{self.repo_url}/git/refs/heads/{branch}", json={"sha": new_commit['sha'], "force": False})
+            if status == 422 and attempt < max_attempts:
+                # Someone else pushed first; rebuild on top of their commit
+                print(f"Ban shards changed while writing, retrying ({attempt}/{max_attempts})")
+                attempt += 1
+                continue
+            if status != 200:
+                raise GitHubError(f"Failed to update {branch}. Status code: {status}: {data}", status)
+
+            for name, (bans, sha) in written.items():
+                self._store_shard(name, bans, sha)
+            self.loaded = True
+            print(f"GitHub ban shards updated ({', '.join(sorted(written))}): {commit_message.splitlines()[0]}")
+            return remote_changed
@@ -0,0 +1,142 @@
+import json
+import sqlite3
+import time
+from ban_index import classify, PERMANENT, INVALID
+from name_index import PrefixIndex
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+ban_db_path = config.get("ban_db_path", "bans.db")
+
+class BanStore:
+    """Local SQLite ban store; the bot's primary copy of the ban list.
+
+    Entries are indexed by player name (primary key) and by expiry. Every
+    local change is also appended to ``pending`` in the same transaction,
+    which the replicator drains into GitHub. Removed bans leave a row in
+    ``lifted`` so the reconciler knows which server-side bans are ours to
+    undo. Banned names are also kept in ``names``, a prefix index for
+    autocomplete. All calls are synchronous and stay well under a
+    millisecond, so they are safe to make from the event loop.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS bans (
+                username TEXT PRIMARY KEY,
+                details TEXT NOT NULL,
+                expires TEXT,
+                state TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bans_expires ON bans (expires) WHERE expires IS NOT NULL;
+            CREATE TABLE IF NOT EXISTS pending (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                details TEXT,
+                message TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lifted (
+                username TEXT PRIMARY KEY,
+                lifted_at REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+        self.bans = {username: json.loads(details) for username, details in self.db.execute("SELECT username, details FROM bans")}
+        self.names = PrefixIndex(self.bans)
+        self.listeners = []
+
+    def __len__(self):
+        return len(self.bans)
+
+    def get(self, username):
+        return self.bans.get(username)
+
+    def _write(self, username, details):
+        if details is None:
+            self.db.execute("DELETE FROM bans WHERE username = ?", (username,))
+            if self.bans.pop(username, None) is not None:
+                self.names.discard(username)
+                self.db.execute("INSERT OR REPLACE INTO lifted (username, lifted_at) VALUES (?, ?)", (username, time.time()))
+        else:
+            self.db.execute("DELETE FROM lifted WHERE username = ?", (username,))
+            expires, state = classify(details)
+            self.db.execute(
+                "INSERT OR REPLACE INTO bans (username, details, expires, state) VALUES (?, ?, ?, ?)",
+                (username, json.dumps(details), expires, state),
+            )
+            self.bans[username] = details
+            self.names.add(username)
+
+    def _notify(self, local):
+        for listener in self.listeners:
+            listener(local)
+
+    def apply(self, changes, message):
+        """Apply ``{username: details}`` locally (``None`` deletes) and queue it for GitHub."""
+        with self.db:
+            for username, details in changes.items():
+                self._write(username, details)
+                self.db.execute(
+                    "INSERT INTO pending (username, details, message) VALUES (?, ?, ?)",
+                    (username, None if details is None else json.dumps(details), message),
+                )
+        self._notify(True)
+
+    def merge_remote(self, remote_bans):
+        """Take edits made on GitHub, except for names with unpushed local changes."""
+        pending_names = {row[0] for row in self.db.execute("SELECT DISTINCT username FROM pending")}
+        changed = False
+        with self.db:
+            for username in [name for name in self.bans if name not in remote_bans and name not in pending_names]:
+                self._write(username, None)
+                changed = True
+            for username, details in remote_bans.items():
+                if username not in pending_names and self.bans.get(username) != details:
+                    self._write(username, details)
+                    changed = True
+        if changed:
+            self._notify(False)
+        return changed
+
+    def pending(self):
+        """Return ``(last_id, changes, messages)`` for every unpushed change, in order."""
+        last_id, changes, messages = None, {}, {}
+        for row_id, username, details, message in self.db.execute("SELECT id, username, details, message FROM pending ORDER BY id"):
+            last_id = row_id
+            changes[username] = None if details is None else json.loads(details)
+            messages[message] = None
+        return last_id, changes, list(messages)
+
+    def pending_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def ack(self, last_id):
+        with self.db:
+            self.db.execute("DELETE FROM pending WHERE id <= ?", (last_id,))
+
+    def expired(self, today):
+        return [row[0] for row in self.db.execute("SELECT username FROM bans WHERE expires <= ?", (today.isoformat(),))]
+
+    def next_expiry(self):
+        row = self.db.execute("SELECT MIN(expires) FROM bans WHERE expires IS NOT NULL").fetchone()
+        return row[0]
+
+    def lifted(self):
+        return {row[0] for row in self.db.execute("SELECT username FROM lifted")}
+
+    def prune_lifted(self, older_than):
+        with self.db:
+            self.db.execute("DELETE FROM lifted WHERE lifted_at < ?", (older_than,))
+
+    def permanent(self):
+        return [row[0] for row in self.db.execute("SELECT username FROM bans WHERE state = ?", (PERMANENT,))]
+
+    def invalid(self):
+        return [row[0] for row in self.db.execute("SELECT username FROM bans WHERE state = ?", (INVALID,))]
+
+ban_store = BanStore(ban_db_path)
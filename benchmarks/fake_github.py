@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import json
+from base64 import b64decode, b64encode
+from aiohttp import web
+
+class FakeContentsServer:
+    """Stand-in for the GitHub contents API serving a single file.
+
+    GET returns the file with its blob sha and an ETag, or 304 when the
+    request's ``If-None-Match`` still matches. PUT must carry the current sha
+    or it is rejected with 409, like a concurrent edit on GitHub. Each reply
+    is delayed by ``latency`` seconds.
+    """
+
+    def __init__(self, path='/bans.json', content=None, latency=0.0):
+        self.path = path
+        self.latency = latency
+        self.gets = 0
+        self.puts = 0
+        self.conflicts = 0
+        self.runner = None
+        self.url = None
+        self._set(json.dumps(content or {}, indent=4))
+
+    def _set(self, text):
+        self.text = text
+        self.sha = hashlib.sha1(f"blob {len(text.encode())}\0{text}".encode()).hexdigest()
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get(self, request):
+        self.gets += 1
+        await self._delay()
+        etag = f'"{self.sha}"'
+        headers = {'ETag': etag, 'X-RateLimit-Remaining': '5000'}
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers=headers)
+        body = {"sha": self.sha, "content": b64encode(self.text.encode()).decode(), "encoding": "base64"}
+        return web.json_response(body, headers=headers)
+
+    async def put(self, request):
+        self.puts += 1
+        await self._delay()
+        payload = await request.json()
+        if payload.get('sha') != self.sha:
+            self.conflicts += 1
+            return web.json_response({"message": "sha does not match"}, status=409)
+        self._set(b64decode(payload['content']).decode())
+        return web.json_response({"content": {"sha": self.sha}}, status=200)
+
+    async def start(self, host='127.0.0.1'):
+        app = web.Application()
+        app.router.add_get(self.path, self.get)
+        app.router.add_put(self.path, self.put)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}{self.path}"
+        return self
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import random
+
+class FakePavlovServer:
+    """Stand-in for a Pavlov server's RCON port.
+
+    Speaks the same handshake as the real server (password prompt, then
+    ``Authenticated=1``) and answers the commands the bot uses. Every reply is
+    delayed by ``latency`` seconds, and with probability ``failure_rate`` the
+    connection is dropped instead of answered. ``players`` online players
+    are reported with fresh kill counts on every InspectAll.
+    """
+
+    def __init__(self, name, latency=0.0, failure_rate=0.0, players=10, bans=(), seed=None):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.players = [f"{name}-player{i}" for i in range(players)]
+        self.bans = set(bans)
+        self.commands = 0
+        self.kills = {}
+        self.random = random.Random(seed)
+        self.server = None
+        self.port = None
+
+    async def start(self, host='127.0.0.1'):
+        self.server = await asyncio.start_server(self.handle, host, 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def reply(self, command):
+        verb, _, argument = command.partition(' ')
+        verb = verb.lower()
+        if verb == 'refreshlist':
+            return {"PlayerList": [{"Username": player, "UniqueId": player} for player in self.players], "Successful": True}
+        if verb == 'inspectall':
+            inspect_list = []
+            for player in self.players:
+                kills = self.kills[player] = self.kills.get(player, 0) + self.random.randint(0, 2)
+                inspect_list.append({"PlayerName": player, "UniqueId": player, "KDA": f"{kills}/{kills // 2}/0", "Cash": "1000", "TeamId": 0})
+            return {"InspectList": inspect_list, "Successful": True}
+        if verb == 'serverinfo':
+            return {"ServerInfo": {"MapLabel": "UGC1", "GameMode": "SND", "ServerName": self.name, "RoundState": "Started", "PlayerCount": f"{len(self.players)}/50"}, "Successful": True}
+        if verb == 'banlist':
+            return {"BanList": sorted(self.bans), "Successful": True}
+        if verb == 'ban':
+            self.bans.add(argument)
+        elif verb == 'unban':
+            self.bans.discard(argument)
+        return {"Command": command, "Successful": True}
+
+    async def handle(self, reader, writer):
+        try:
+            writer.write(b"Password: ")
+            await writer.drain()
+            await reader.read(4096)
+            writer.write(b"Authenticated=1")
+            await writer.drain()
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                self.commands += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.failure_rate and self.random.random() < self.failure_rate:
+                    break
+                writer.write(json.dumps(self.reply(data.decode())).encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def start_fleet(count, **kwargs):
+    """Start ``count`` fake servers and return them with a servers.json mapping."""
+    fleet = [await FakePavlovServer(f"bench{i}", seed=i, **kwargs).start() for i in range(count)]
+    servers = {server.name: {"ip": "127.0.0.1", "port": server.port, "password": "bench"} for server in fleet}
+    return fleet, servers
@@ -0,0 +1,282 @@
+"""Benchmarks for the bot's hot paths against local fake servers.
+
+Run from the repository root:
+
+    python benchmarks/run.py                      # everything, default sizes
+    python benchmarks/run.py fanout leaderboard   # a subset
+    python benchmarks/run.py --json before.json   # save the numbers
+    python benchmarks/run.py --compare before.json
+
+Nothing here talks to Discord, real Pavlov servers or GitHub. The bot's
+modules are imported from a scratch directory holding a generated
+config.json and servers.json that point at the fakes.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_pavlov import start_fleet
+from fake_github import FakeContentsServer
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+class Results:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, benchmark, metric, value, unit):
+        self.rows.append({"benchmark": benchmark, "metric": metric, "value": value, "unit": unit})
+
+    def add_timings(self, benchmark, metric, timings):
+        timings = sorted(timings)
+        self.add(benchmark, f"{metric} p50", statistics.median(timings) * 1000, "ms")
+        self.add(benchmark, f"{metric} p95", timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, "ms")
+
+@contextlib.contextmanager
+def quiet():
+    # The bot prints every RCON reply; keep that out of the report (it is still paid for)
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def write_config(workdir, servers, args):
+    config = {
+        "discord_bot_token": "benchmark",
+        "allowed_channel_id": 0,
+        "github_username": "benchmark",
+        "repo_name": "benchmark",
+        "file_path": "bans.json",
+        "access_token": "",
+        "required_roles": ["Admin"],
+        "log_channel_id": 0,
+        "default_role_id": 0,
+        "rcon_timeout": 5,
+        "snapshot_ttl": 0,
+        "ban_write_window": args.write_window,
+        "github_retries": 0,
+    }
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump(config, f)
+    with open(os.path.join(workdir, 'servers.json'), 'w') as f:
+        json.dump(servers, f)
+
+@benchmark("check_bans")
+async def bench_check_bans(args, servers, results):
+    from ban_store import BanStore
+    from command_outbox import outbox
+
+    store = BanStore(os.path.join(os.getcwd(), 'check_bans.db'))
+    today = date.today()
+    bans = {}
+    for i in range(args.bans):
+        banned_until = today + timedelta(days=random.randint(1, 365)) if i % 10 else 'perm'
+        bans[f"player{i}"] = {"banneduntil": str(banned_until), "BanReason": "benchmark"}
+    started = time.perf_counter()
+    store.apply(bans, "benchmark bans")
+    results.add("check_bans", f"load {args.bans} bans", (time.perf_counter() - started) * 1000, "ms")
+
+    # A pass with nothing due, which is what almost every scheduler wake-up is
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        store.expired(today)
+        store.next_expiry()
+        timings.append(time.perf_counter() - started)
+    results.add_timings("check_bans", "idle pass", timings)
+
+    # A pass that lifts a handful of bans everywhere, as bot.check_bans does
+    expiring = [f"player{i}" for i in range(1, args.bans, 10)][:args.expiring]
+    store.apply({username: {"banneduntil": str(today - timedelta(days=1)), "BanReason": "benchmark"} for username in expiring}, "expire")
+    started = time.perf_counter()
+    users_to_unban = store.expired(today)
+    store.apply({user: None for user in users_to_unban}, "lift expired")
+    with quiet():
+        report = await outbox.deliver(servers, [f"unban {user}" for user in users_to_unban])
+    results.add("check_bans", f"lift {len(users_to_unban)} bans on {len(servers)} servers", (time.perf_counter() - started) * 1000, "ms")
+    results.add("check_bans", "servers failed", len(report.failed), "servers")
+
+@benchmark("fanout")
+async def bench_fanout(args, servers, results):
+    from fanout import fan_out
+
+    timings = []
+    failed = 0
+    for i in range(args.rounds):
+        started = time.perf_counter()
+        with quiet():
+            report = await fan_out(servers, f"ban fanout{i}")
+        timings.append(time.perf_counter() - started)
+        failed += len(report.failed)
+    results.add_timings("fanout", f"ban on {len(servers)} servers", timings)
+    results.add("fanout", "failed server results", failed, "servers")
+
+@benchmark("stats_poll")
+async def bench_stats_poll(args, servers, results):
+    with quiet():
+        from leaderboardcmd import poll_server_stats, player_stats
+
+    timings = []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        with quiet():
+            counts = await asyncio.gather(*(poll_server_stats(server_name, details) for server_name, details in servers.items()))
+        timings.append(time.perf_counter() - started)
+    results.add_timings("stats_poll", f"poll {len(servers)} servers", timings)
+    results.add("stats_poll", "servers answered last round", sum(1 for count in counts if count is not None), "servers")
+    results.add("stats_poll", "players tracked", len(player_stats), "players")
+
+@benchmark("leaderboard")
+async def bench_leaderboard(args, servers, results):
+    from stats_store import StatsStore
+    from leaderboard_index import Leaderboard
+
+    store = StatsStore(os.path.join(os.getcwd(), 'leaderboard'), wal_max=args.players * 2)
+    with quiet():
+        store.load()
+    rng = random.Random(1)
+    for i in range(args.players):
+        store.record(f"player{i}", rng.randint(0, 5000), rng.randint(0, 5000))
+    store.flush()
+
+    leaderboard = Leaderboard(store)
+    started = time.perf_counter()
+    leaderboard.rebuild()
+    results.add("leaderboard", f"rebuild {args.players} players", (time.perf_counter() - started) * 1000, "ms")
+
+    pages = max(1, args.players // 10)
+    timings = []
+    for category in ("Kills", "KD", "Deaths"):
+        for _ in range(300):
+            started = time.perf_counter()
+            leaderboard.page(category, rng.randint(1, pages))
+            timings.append(time.perf_counter() - started)
+    results.add_timings("leaderboard", "/leaderboard page", timings)
+
+    timings = []
+    for _ in range(1000):
+        username = f"player{rng.randrange(args.players)}"
+        started = time.perf_counter()
+        leaderboard.rank("KD", username)
+        timings.append(time.perf_counter() - started)
+    results.add_timings("leaderboard", "/rank", timings)
+
+    updates = 20000
+    started = time.perf_counter()
+    for _ in range(updates):
+        player_id, old = store.record(f"player{rng.randrange(args.players)}", 1, 0)
+        leaderboard.update(player_id, old)
+    results.add("leaderboard", "stat updates", updates / (time.perf_counter() - started), "ops/s")
+    store.close()
+
+@benchmark("ban_ingest")
+async def bench_ban_ingest(args, servers, results):
+    from ban_store import BanStore
+    from ban_cache import BanCache
+    from ban_replicator import BanReplicator
+
+    github_fake = await FakeContentsServer(latency=args.github_latency).start()
+    store = BanStore(os.path.join(os.getcwd(), 'ingest.db'))
+    replicator = BanReplicator(store, BanCache(github_fake.url), interval=60, window=args.write_window)
+    task = asyncio.create_task(replicator.run())
+    try:
+        started = time.perf_counter()
+        for i in range(args.messages):
+            # One ban message, handled the way on_message records it
+            store.apply({f"ingest{i}": {"banneduntil": "2099-01-01", "BanReason": "benchmark"}}, f"User ingest{i} banned")
+            await asyncio.sleep(0)
+        recorded = time.perf_counter() - started
+        with quiet():
+            while store.pending()[0] is not None:
+                await asyncio.sleep(0.01)
+        replicated = time.perf_counter() - started
+    finally:
+        task.cancel()
+        await github_fake.stop()
+
+    results.add("ban_ingest", f"record {args.messages} bans", args.messages / recorded, "bans/s")
+    results.add("ban_ingest", "replicated to GitHub", args.messages / replicated, "bans/s")
+    results.add("ban_ingest", "GitHub commits", github_fake.puts - github_fake.conflicts, "commits")
+    results.add("ban_ingest", "bans in GitHub file", len(json.loads(github_fake.text)), "bans")
+
+def print_results(rows, baseline=None):
+    previous = {(row["benchmark"], row["metric"]): row["value"] for row in baseline or []}
+    width = max(len(f"{row['benchmark']}: {row['metric']}") for row in rows)
+    for row in rows:
+        label = f"{row['benchmark']}: {row['metric']}".ljust(width)
+        line = f"{label}  {row['value']:>12.2f} {row['unit']}"
+        before = previous.get((row["benchmark"], row["metric"]))
+        if before:
+            line += f"  ({(row['value'] - before) / before * 100:+.1f}% vs baseline)"
+        print(line)
+
+async def main(args):
+    fleet, servers = await start_fleet(args.servers, latency=args.latency, failure_rate=args.failure_rate, players=args.server_players)
+    workdir = tempfile.mkdtemp(prefix='pavlov-bench-')
+    write_config(workdir, servers, args)
+    os.chdir(workdir)
+
+    results = Results()
+    try:
+        for name in args.benchmarks or BENCHMARKS:
+            print(f"Running {name}...", file=sys.stderr)
+            await BENCHMARKS[name](args, servers, results)
+    finally:
+        from rcon_pool import pool
+        from github_client import github
+        await pool.close()
+        await github.close()
+        for server in fleet:
+            await server.stop()
+    return results.rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--servers', type=int, default=50, help="fake Pavlov servers to start")
+    parser.add_argument('--server-players', type=int, default=20, help="players online on each fake server")
+    parser.add_argument('--latency', type=float, default=0.01, help="seconds each fake server takes to answer")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of RCON commands the fake servers drop")
+    parser.add_argument('--github-latency', type=float, default=0.05, help="seconds the fake GitHub API takes to answer")
+    parser.add_argument('--bans', type=int, default=20000, help="bans in the store for check_bans")
+    parser.add_argument('--expiring', type=int, default=20, help="bans that expire in the check_bans pass")
+    parser.add_argument('--players', type=int, default=100000, help="players in the leaderboard")
+    parser.add_argument('--messages', type=int, default=1000, help="ban messages for ban_ingest")
+    parser.add_argument('--write-window', type=float, default=0.05, help="ban_write_window used by ban_ingest")
+    parser.add_argument('--rounds', type=int, default=10, help="repetitions of fan-out and polling rounds")
+    parser.add_argument('--json', metavar='PATH', help="save results to PATH")
+    parser.add_argument('--compare', metavar='PATH', help="show the change against results saved with --json")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    # main() moves into a scratch directory, so resolve these first
+    json_path = os.path.abspath(args.json) if args.json else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    rows = asyncio.run(main(args))
+    baseline = None
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = json.load(f)
+    print_results(rows, baseline)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(rows, f, indent=2)
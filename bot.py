@@ -1,12 +1,21 @@
 import discord
-from discord.ext import commands, tasks
-import requests
+from discord.ext import commands
 import json
-from base64 import b64decode, b64encode
-from datetime import datetime, date
+import hashlib
+from datetime import datetime, date, time
 import asyncio
-from commands import setup_commands, get_server_details, send_pavlov_command  # Import necessary functions from commands.py
-from leaderboardcmd import setup_leaderboard_commands, update_player_stats  # Import leaderboard functions
+from commands import setup_commands  # Import necessary functions from commands.py
+from leaderboardcmd import setup_leaderboard_commands, update_player_stats, player_stats  # Import leaderboard functions
+from command_outbox import outbox
+from github_client import github
+from ban_store import ban_store
+from ban_replicator import replicator
+from reconciler import reconciler
+from metrics import metrics, run_metrics
+from ban_import import parse_message, parse_attachment
+from audit_log import audit_log
+from progress import FanOutProgress
+from rcon_pool import pool
 
 # Load configuration
 with open('config.json') as config_file:
@@ -29,100 +38,120 @@ api_url = f'https://api.github.com/repos/{github_username}/{repo_name}/contents/
 bot_status = config.get("bot_status", "Online")
 bot_version = config.get("bot_version", "1.0.0")
 log_channel_id = config["log_channel_id"]
+ban_refresh_interval = config.get("ban_refresh_interval", 60)
+ban_import_max_bytes = config.get("ban_import_max_bytes", 1048576)
+command_tree_fingerprint_path = config.get("command_tree_fingerprint_path", "command_tree.sha256")
 
 # Load server details from JSON file
 with open('servers.json') as f:
     servers = json.load(f)
 
 # Functions
-async def update_github_file(api_url, content, commit_message):
-    response = requests.get(api_url)
-    data = json.loads(response.content.decode('utf-8'))
-
-    url = data.get('url', '')
-    sha = data.get('sha', '')
-
-    update_url = f'{url}?access_token={access_token}'
-
-    data = {
-        'message': commit_message,
-        'content': b64encode(json.dumps(content, indent=4).encode('utf-8')).decode('utf-8'),
-        'sha': sha,
-    }
-
-    response = requests.put(update_url, headers={'Authorization': f'token {access_token}'}, json=data)
-    print(response.text)
-
 async def log_to_console(message):
     print(message)
 
-async def log_command(interaction, command_name, args):
-    log_channel = interaction.guild.get_channel(log_channel_id)
-    if log_channel:
-        embed = discord.Embed(title="Command Used", color=discord.Color.blue())
-        embed.add_field(name="User", value=interaction.user.mention, inline=True)
-        embed.add_field(name="Command", value=command_name, inline=True)
-        embed.add_field(name="Arguments", value=str(args), inline=True)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
-        embed.add_field(name="Timestamp", value=interaction.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=True)
-        await log_channel.send(embed=embed)
-
-# Check bans every minute
-@tasks.loop(minutes=1)
-async def check_bans():
-    response = requests.get(api_url)
-
-    if response.status_code == 200:
-        data = json.loads(response.content.decode('utf-8'))
+def log_fanout_report(title, report):
+    # Queued for the audit log's background sender
+    color = discord.Color.green() if report.ok else discord.Color.orange()
+    embed = discord.Embed(title=title, description="\n".join(report.lines())[:4000], color=color)
+    embed.add_field(name="Commands", value=", ".join(report.commands)[:1024], inline=False)
+    embed.add_field(name="Result", value=report.summary(), inline=False)
+    audit_log.record_embed(embed)
 
-        if 'content' in data:
-            raw_content = b64decode(data['content']).decode('utf-8')
-            try:
-                banned_users = json.loads(raw_content)
-            except json.JSONDecodeError as e:
-                return
-        else:
-            return
-    else:
+# Lift bans whose time is up
+async def check_bans():
+    # Only the expired entries are read, straight off the store's expiry index
+    users_to_unban = ban_store.expired(date.today())
+    if not users_to_unban:
         return
 
-    current_date = date.today()
+    # Remove users from the ban store; the replicator updates ban.json on GitHub
+    commit_message = f"Users unbanned as their ban time expired: {', '.join(users_to_unban)}"
+    ban_store.apply({user: None for user in users_to_unban}, commit_message)
+    for user in users_to_unban:
+        audit_log.record(f"Ban on {user} expired and was lifted")
+    metrics.inc("pavlov_bans_lifted_total", value=len(users_to_unban))
+
+    # Unban the players via PavlovRCON on all servers at once
+    report = await outbox.deliver(servers, [f"unban {user}" for user in users_to_unban])
+    log_fanout_report("Expired Bans Lifted", report)
+
+ban_wakeup = asyncio.Event()
+ban_store.listeners.append(lambda local: ban_wakeup.set())
+ban_scheduler_task = None
+replicator_task = None
+reconciler_task = None
+outbox_task = None
+metrics_task = None
+audit_log_task = None
+stats_task = None
+warm_up_task = None
+sync_task = None
+
+def collect_queue_metrics(metrics):
+    metrics.set("pavlov_bans", len(ban_store.bans))
+    queued = outbox.counts()
+    for server_name in servers:
+        metrics.set("pavlov_outbox_queued", queued.get(server_name, 0), {"server": server_name})
+    for priority, count in github.limiter.counts().items():
+        metrics.set("pavlov_github_queued", count, {"priority": priority})
+
+metrics.collectors.append(collect_queue_metrics)
+
+async def ban_scheduler():
+    # Sleeps until the next expiry; any change to the store wakes it early
+    failures = 0
+    while True:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await check_bans()
+            failures = 0
+        except Exception as e:
+            failures += 1
+            print(f"check_bans failed: {e}")
+        metrics.observe("pavlov_check_bans_seconds", loop.time() - started)
+
+        delay = ban_refresh_interval
+        next_expiry = ban_store.next_expiry()
+        if next_expiry is not None:
+            until_expiry = (datetime.combine(date.fromisoformat(next_expiry), time.min) - datetime.now()).total_seconds()
+            delay = max(0, min(delay, until_expiry))
+        if failures:
+            # The expired ban is still in the store, so its date is already past; back off instead of spinning
+            delay = max(delay, min(ban_refresh_interval, 2 ** failures))
+
+        ban_wakeup.clear()
+        try:
+            await asyncio.wait_for(ban_wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
 
-    if not banned_users:
+def command_tree_fingerprint():
+    # Stable hash of exactly what a sync would upload, plus the application it goes to
+    payload = sorted((command.to_dict(bot.tree) for command in bot.tree.get_commands()), key=lambda command: command['name'])
+    return hashlib.sha256(json.dumps([bot.application_id, payload], sort_keys=True).encode('utf-8')).hexdigest()
+
+async def sync_command_tree():
+    fingerprint = command_tree_fingerprint()
+    try:
+        with open(command_tree_fingerprint_path) as f:
+            synced_fingerprint = f.read().strip()
+    except OSError:
+        synced_fingerprint = None
+    if fingerprint == synced_fingerprint:
+        print('Slash commands unchanged since the last sync; skipping sync.')
         return
 
-    users_to_unban = []
-    for user, details in banned_users.items():
-        banned_until = parse_date(details.get('banneduntil'))
-        if banned_until and current_date >= banned_until:
-            # Unban the player via PavlovRCON for all servers
-            for server_name in servers:
-                server_details = get_server_details(server_name, servers)
-                if server_details:
-                    unban_command = f"unban {user}"
-                    await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], unban_command)
-            users_to_unban.append(user)
-
-    if users_to_unban:
-        # Remove users from the JSON data
-        for user in users_to_unban:
-            del banned_users[user]
-
-        # Update ban.json on GitHub
-        commit_message = f"Users unbanned as their ban time expired: {', '.join(users_to_unban)}"
-        await update_github_file(api_url, banned_users, commit_message)
-
-def parse_date(date_str):
     try:
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except ValueError:
-        try:
-            return datetime.strptime(date_str, '%d-%m-%Y').date()
-        except ValueError:
-            try:
-                return datetime.strptime(date_str, '%Y/%m/%d').date()
-            except ValueError:
-                return None
+        synced = await bot.tree.sync()
+        print(f'Successfully synced {len(synced)} commands with Discord.')
+    except Exception as e:
+        print(f'Failed to sync commands: {e}')
+        await log_to_console('Warning: Syncing commands failed. Use /debug for more information.')
+        return
+    with open(command_tree_fingerprint_path, 'w') as f:
+        f.write(fingerprint)
 
 # Events
 @bot.event
@@ -131,29 +160,41 @@ async def on_ready():
     await log_to_console('Ban Manager Watching')
     await log_to_console('Bot is Online')
 
-    check_bans.start()  # Start the check_bans task when the bot is ready
-    asyncio.create_task(update_player_stats())  # Start tracking player stats
+    # on_ready fires again after every reconnect; start everything only once, all at the same time
+    global ban_scheduler_task, replicator_task, reconciler_task, outbox_task, metrics_task, audit_log_task, stats_task, warm_up_task, sync_task
+    if ban_scheduler_task is None:
+        sync_task = asyncio.create_task(sync_command_tree())  # Only talks to Discord when the commands changed
+        warm_up_task = asyncio.create_task(pool.warm_up())  # Open RCON connections before the first command needs them
+        audit_log_task = asyncio.create_task(audit_log.run(lambda: bot.get_channel(log_channel_id)))  # Batched log channel messages
+        metrics_task = asyncio.create_task(run_metrics())  # Event-loop lag, plus the Prometheus endpoint/file if configured
+        ban_scheduler_task = asyncio.create_task(ban_scheduler())  # Start lifting expired bans when the bot is ready
+        replicator_task = asyncio.create_task(replicator.run())  # Keep ban.json on GitHub in step with the local store
+        reconciler_task = asyncio.create_task(reconciler.run())  # Repair servers whose ban lists drifted
+        outbox_task = asyncio.create_task(outbox.run())  # Replay bans and unbans once offline servers come back
+        stats_task = asyncio.create_task(update_player_stats())  # Start tracking player stats
 
     # Set bot status with version
     await bot.change_presence(activity=discord.Game(name=f"{bot_status} v{bot_version}"))
 
-    try:
-        synced = await bot.tree.sync()
-        print(f'Successfully synced {len(synced)} commands with Discord.')
-    except Exception as e:
-        print(f'Failed to sync commands: {e}')
-        await log_to_console('Warning: Syncing commands failed. Use /debug for more information.')
-
 @bot.event
 async def on_message(message):
     if message.author == bot.user:
         return
 
     if message.channel.id == allowed_channel_id:
-        if message.content.count('\n') == 2:
+        attachments = [attachment for attachment in message.attachments if attachment.filename.lower().endswith(('.csv', '.json'))]
+        if attachments:
+            await import_bans_from_attachments(attachments, message.channel)
+        elif message.content.count('\n') == 2:
             author_name, current_date, ban_reason = map(str.strip, message.content.split('\n'))
             await log_message_to_github(author_name, current_date, ban_reason, message.channel)
-            await ban_user_on_all_servers(author_name)
+            # One message, edited as each server answers
+            progress = await FanOutProgress(f"Ban for {author_name}", servers, message.channel.send).start()
+            report = await ban_user_on_all_servers(author_name, on_result=progress.on_result)
+            await progress.finish(f"Ban for {author_name} applied: {report.summary()}")
+            log_fanout_report(f"Ban Applied: {author_name}", report)
+        elif message.content.count('\n') > 2:
+            await import_bans(parse_message(message.content), "ban message", message.channel)
         else:
             await message.channel.send("Invalid format. Please use the format:\nName\nDate\nReason")
 
@@ -161,29 +202,49 @@ async def on_message(message):
 
 # Bot commands
 async def log_message_to_github(author_name, current_date, ban_reason, message_channel):
-    response = requests.get(api_url)
-    data = json.loads(response.content.decode('utf-8'))
-
-    if 'content' in data:
-        try:
-            raw_content = b64decode(data['content']).decode('utf-8')
-            messages = json.loads(raw_content)
-        except json.JSONDecodeError as e:
-            messages = {}
-    else:
-        messages = {}
-
-    messages[author_name] = {'banneduntil': current_date, 'BanReason': ban_reason}
-
     commit_message = f"User {author_name} banned until {current_date} for reason: {ban_reason}"
-    await update_github_file(api_url, messages, commit_message)
+    # Recorded locally right away; the replicator commits it to GitHub in the background
+    ban_store.apply({author_name: {'banneduntil': current_date, 'BanReason': ban_reason}}, commit_message)
 
-    await message_channel.send(f"Message received and processed:\nName: {author_name}\nDate: {current_date}\nReason: {ban_reason}")
+    # Replication failures and recoveries are reported to the log channel by the replicator
+    await message_channel.send(f"Message received and saved to the ban list (GitHub is updated in the background):\nName: {author_name}\nDate: {current_date}\nReason: {ban_reason}")
 
-async def ban_user_on_all_servers(username):
+async def import_bans_from_attachments(attachments, message_channel):
+    for attachment in attachments:
+        if attachment.size > ban_import_max_bytes:
+            await message_channel.send(f"{attachment.filename} is too large to import ({attachment.size} bytes, limit {ban_import_max_bytes}).")
+            continue
+        try:
+            ban_import = parse_attachment(attachment.filename, await attachment.read())
+        except (discord.HTTPException, UnicodeDecodeError) as e:
+            await message_channel.send(f"Could not read {attachment.filename}: {e}")
+            continue
+        await import_bans(ban_import, attachment.filename, message_channel)
+
+async def import_bans(ban_import, source, message_channel):
+    # All accepted entries go in as one store update (one GitHub commit) and one fan-out
+    report = None
+    if ban_import.accepted:
+        names = list(ban_import.accepted)
+        commit_message = f"Imported {len(names)} bans from {source}: {', '.join(names[:20])}" + (" ..." if len(names) > 20 else "")
+        ban_store.apply(ban_import.accepted, commit_message)
+        progress = await FanOutProgress(f"Importing {len(names)} bans from {source}", servers, message_channel.send).start()
+        report = await outbox.deliver(servers, [f"ban {username}" for username in names], on_result=progress.on_result)
+        await progress.finish(report.summary())
+
+    embed = discord.Embed(title=f"Ban Import: {source}", color=discord.Color.green() if not ban_import.rejected else discord.Color.orange())
+    embed.add_field(name="Entries", value=ban_import.summary(), inline=False)
+    if ban_import.rejected:
+        embed.add_field(name="Rejected", value="\n".join(ban_import.rejected_lines())[:1024], inline=False)
+    if report is not None:
+        embed.add_field(name="Servers", value=report.summary(), inline=False)
+    await message_channel.send(embed=embed)
+    if report is not None:
+        log_fanout_report(f"Bans Imported: {source}", report)
+
+async def ban_user_on_all_servers(username, on_result=None):
     ban_command = f"ban {username}"
-    for server_name, server_details in servers.items():
-        await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], ban_command)
+    return await outbox.deliver(servers, ban_command, on_result=on_result)
 
 # Setup the commands from commands.py and leaderboardcmd.py
 async def setup(bot):
@@ -192,7 +253,13 @@ async def setup(bot):
 
 async def main():
     await setup(bot)
-    await bot.start(config['discord_bot_token'])
+    try:
+        await bot.start(config['discord_bot_token'])
+    finally:
+        await github.close()
+        player_stats.close()
+        audit_log.close()
+        await pool.close()
 
 # Run the bot
 asyncio.run(main())
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import sqlite3
+import time
+from fanout import fan_out, fanout_timeout, CommandResult, ServerResult, FanOutReport
+from rcon_pool import pool, servers
+from server_health import health
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+outbox_db_path = config.get("outbox_db_path", "outbox.db")
+outbox_retry_interval = config.get("outbox_retry_interval", 30)
+
+class CommandOutbox:
+    """Durable per-server queue for ban and unban commands that did not land.
+
+    Commands are stored in SQLite and replayed in their original order once
+    the server's circuit closes again. While a server still has queued
+    commands, new ones for it are queued behind them rather than sent, so a
+    late replay can never undo a newer command.
+    """
+
+    def __init__(self, path, servers, retry_interval=30):
+        self.servers = servers
+        self.retry_interval = retry_interval
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                server_name TEXT NOT NULL,
+                command TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS outbox_server ON outbox (server_name, id);
+        """)
+        self.db.commit()
+        self._wakeup = asyncio.Event()
+        health.listeners.append(lambda server_name: self._wakeup.set())
+
+    def enqueue(self, server_name, commands):
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO outbox (server_name, command, created_at) VALUES (?, ?, ?)",
+                [(server_name, command, now) for command in commands],
+            )
+
+    def counts(self):
+        return dict(self.db.execute("SELECT server_name, COUNT(*) FROM outbox GROUP BY server_name"))
+
+    def has_pending(self, server_name):
+        return self.db.execute("SELECT 1 FROM outbox WHERE server_name = ? LIMIT 1", (server_name,)).fetchone() is not None
+
+    async def deliver(self, server_names, commands, on_result=None):
+        """Send ``commands`` to every server, queueing whatever cannot be sent now."""
+        if isinstance(commands, str):
+            commands = [commands]
+        queued = [server_name for server_name in server_names if self.has_pending(server_name)]
+        direct = [server_name for server_name in server_names if server_name not in queued]
+
+        def queue_failures(result):
+            failed_at = next((i for i, command_result in enumerate(result.commands) if not command_result.ok), None)
+            if failed_at is not None:
+                # Everything from the first failure on is retried, keeping the order
+                self.enqueue(result.server_name, commands[failed_at:])
+                for command_result in result.commands[failed_at:]:
+                    command_result.error = f"{command_result.error or 'not sent'}; queued for retry"
+            if on_result is not None:
+                on_result(result)
+
+        results = []
+        for server_name in queued:
+            self.enqueue(server_name, commands)
+            result = ServerResult(server_name)
+            result.commands = [CommandResult(command, False, error="queued behind earlier commands") for command in commands]
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+        report = await fan_out(direct, commands, on_result=queue_failures)
+        return FanOutReport(commands, report.results + results)
+
+    async def replay(self, server_name):
+        rows = self.db.execute("SELECT id, command FROM outbox WHERE server_name = ? ORDER BY id", (server_name,)).fetchall()
+        for row_id, command in rows:
+            try:
+                response = await asyncio.wait_for(pool.send_to(server_name, command), fanout_timeout)
+            except Exception as e:
+                with self.db:
+                    self.db.execute("UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?", (str(e) or type(e).__name__, row_id))
+                return False
+            print(f"Replayed '{command}' on {server_name}: {response}")
+            with self.db:
+                self.db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+        return True
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            ready = [server_name for server_name in self.counts() if server_name in self.servers and health.is_available(server_name)]
+            if ready:
+                await asyncio.gather(*(self.replay(server_name) for server_name in ready), return_exceptions=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.retry_interval)
+            except asyncio.TimeoutError:
+                pass
+
+outbox = CommandOutbox(outbox_db_path, servers, retry_interval=outbox_retry_interval)
@@ -1,10 +1,19 @@
 import asyncio
 import json
-import requests
-from base64 import b64decode
+from datetime import datetime, timezone
 import discord
 from discord import app_commands
-from pavlov import PavlovRCON
+from rcon_pool import send_pavlov_command
+from ban_store import ban_store
+from snapshot_cache import snapshot_cache
+from reconciler import reconciler
+from server_health import health
+from command_outbox import outbox
+from metrics import metrics
+from audit_log import log_command
+from progress import FanOutProgress
+from fleet_query import query_fleet
+from autocomplete import server_name_autocomplete, banned_name_autocomplete, online_player_autocomplete
 
 # Load configuration
 with open('config.json') as config_file:
@@ -13,11 +22,38 @@ with open('config.json') as config_file:
 required_roles = config["required_roles"]
 bot_version = config.get("bot_version", "1.0.0")
 programming_language = "Python 3.9"
-log_channel_id = config["log_channel_id"]
+command_timeout = config.get("command_timeout", 10)
+fleet_page_size = 20
 
 def get_server_details(server_name, servers):
     return servers.get(server_name)
 
+async def send_command(interaction, server_details, command):
+    """Defer the interaction, then send ``command`` within ``command_timeout``.
+
+    Deferring first keeps Discord from failing the interaction while the
+    server answers; replies after this go through ``interaction.followup``.
+    Returns ``None`` on failure or timeout, like ``send_pavlov_command``.
+    """
+    if not interaction.response.is_done():
+        await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        return await asyncio.wait_for(send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], command), command_timeout)
+    except asyncio.TimeoutError:
+        print(f"Pavlov command '{command}' timed out after {command_timeout}s")
+        return None
+
+def fleet_embed(title, lines, page, query, empty):
+    """One page of a merged fleet-wide result, with the servers that did not answer."""
+    total_pages = max(1, -(-len(lines) // fleet_page_size))
+    page = min(max(page, 1), total_pages)
+    shown = lines[(page - 1) * fleet_page_size:page * fleet_page_size]
+    embed = discord.Embed(title=title, description=("\n".join(shown) or empty)[:4096], color=discord.Color.blue())
+    if query.errors:
+        embed.add_field(name="Not answering", value="\n".join(query.error_lines())[:1024], inline=False)
+    embed.set_footer(text=f"Page {page}/{total_pages} · {query.summary()}")
+    return embed
+
 def has_required_role(user, required_roles):
     user_roles = [role.name for role in user.roles]
     for role in required_roles:
@@ -25,31 +61,10 @@ def has_required_role(user, required_roles):
             return True
     return False
 
-async def send_pavlov_command(host, port, password, command):
-    try:
-        pavlov = PavlovRCON(host, port, password)
-        task = asyncio.create_task(pavlov.send(command))
-        response = await task
-        print(f"Pavlov response: {response}")
-        return response if isinstance(response, str) else json.dumps(response)
-    except Exception as e:
-        print(f"Failed to send Pavlov command: {e}")
-        return None
-
-async def log_command(interaction, command_name, args):
-    log_channel = interaction.guild.get_channel(log_channel_id)
-    if log_channel:
-        embed = discord.Embed(title="Command Used", color=discord.Color.blue())
-        embed.add_field(name="User", value=interaction.user.mention, inline=True)
-        embed.add_field(name="Command", value=command_name, inline=True)
-        embed.add_field(name="Arguments", value=str(args), inline=True)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
-        embed.add_field(name="Timestamp", value=interaction.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=True)
-        await log_channel.send(embed=embed)
-
 async def setup_commands(bot, servers, api_url, access_token):
     @bot.tree.command(name="kick", description="Kick a player from a server")
     @app_commands.describe(server_name="The name of the server", player_name="The name of the player to kick")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, player_name=online_player_autocomplete)
     async def kick(interaction: discord.Interaction, server_name: str, player_name: str):
         await log_command(interaction, "kick", {"server_name": server_name, "player_name": player_name})
 
@@ -63,14 +78,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         kick_command = f"kick {player_name}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], kick_command)
+        response = await send_command(interaction, server_details, kick_command)
         if response:
-            await interaction.response.send_message(f"Player {player_name} kicked from {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Player {player_name} kicked from {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to kick player {player_name} from {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to kick player {player_name} from {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="rotatemap", description="Rotate map on a server")
     @app_commands.describe(server_name="The name of the server")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def rotatemap(interaction: discord.Interaction, server_name: str):
         await log_command(interaction, "rotatemap", {"server_name": server_name})
 
@@ -84,14 +100,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         rotate_command = "RotateMap"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], rotate_command)
+        response = await send_command(interaction, server_details, rotate_command)
         if response:
-            await interaction.response.send_message(f"Map rotated on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Map rotated on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to rotate map on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to rotate map on {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="giveitem", description="Give an item to a player")
     @app_commands.describe(server_name="The name of the server", username="The name of the player", item_id="The ID of the item to give")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, username=online_player_autocomplete)
     async def giveitem(interaction: discord.Interaction, server_name: str, username: str, item_id: str):
         await log_command(interaction, "giveitem", {"server_name": server_name, "username": username, "item_id": item_id})
 
@@ -105,14 +122,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         give_item_command = f"giveitem {username} {item_id}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], give_item_command)
+        response = await send_command(interaction, server_details, give_item_command)
         if response:
-            await interaction.response.send_message(f"Item {item_id} given to {username} on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Item {item_id} given to {username} on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to give item {item_id} to {username} on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to give item {item_id} to {username} on {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="players", description="Get the list of players on a server")
     @app_commands.describe(server_name="The name of the server")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def players(interaction: discord.Interaction, server_name: str):
         await log_command(interaction, "players", {"server_name": server_name})
 
@@ -121,27 +139,26 @@ async def setup_commands(bot, servers, api_url, access_token):
             await interaction.response.send_message(f"Server '{server_name}' not found.", ephemeral=True)
             return
 
-        players_command = "RefreshList"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], players_command)
-        print(f"Player list response: {response}")  # Debug print
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Shared with the stats poller; concurrent /players calls make one RCON round-trip
+        try:
+            response = await asyncio.wait_for(snapshot_cache.get(server_name, "RefreshList"), command_timeout)
+        except asyncio.TimeoutError:
+            response = None
 
         if response:
-            try:
-                player_list_data = json.loads(response)
-                player_list = player_list_data.get('PlayerList', [])
-                if player_list:
-                    formatted_player_list = "\n".join([f"{player['Username']}" for player in player_list])
-                    response_message = f"Current Players on {server_name}:\n```\n{formatted_player_list}\n```"
-                    await interaction.response.send_message(response_message, ephemeral=True)
-                else:
-                    await interaction.response.send_message(f"No players currently on server '{server_name}'.", ephemeral=True)
-            except json.JSONDecodeError:
-                await interaction.response.send_message("Failed to parse player list response.", ephemeral=True)
+            if response.players:
+                formatted_player_list = "\n".join([f"{player.username}" for player in response.players])
+                response_message = f"Current Players on {server_name}:\n```\n{formatted_player_list}\n```"
+                await interaction.followup.send(response_message, ephemeral=True)
+            else:
+                await interaction.followup.send(f"No players currently on server '{server_name}'.", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to retrieve player list for server '{server_name}'.", ephemeral=True)
+            await interaction.followup.send(f"Failed to retrieve player list for server '{server_name}'.", ephemeral=True)
 
     @bot.tree.command(name="banlist", description="Get the ban list for a server")
     @app_commands.describe(server_name="The name of the server")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def banlist(interaction: discord.Interaction, server_name: str):
         await log_command(interaction, "banlist", {"server_name": server_name})
 
@@ -151,53 +168,180 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         banlist_command = "banlist"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], banlist_command)
+        response = await send_command(interaction, server_details, banlist_command)
         if response:
-            try:
-                ban_list_data = json.loads(response)
-                banned_players = ban_list_data.get('BanList', [])
-                if banned_players:
-                    formatted_ban_list = "\n".join(banned_players)
-                    response_message = f"Banned Players on {server_name}:\n```\n{formatted_ban_list}\n```"
-                    await interaction.response.send_message(response_message, ephemeral=True)
-                else:
-                    await interaction.response.send_message(f"No banned players currently on server '{server_name}'.", ephemeral=True)
-            except json.JSONDecodeError:
-                await interaction.response.send_message("Failed to parse ban list response.", ephemeral=True)
+            if response.bans:
+                formatted_ban_list = "\n".join(sorted(response.bans))
+                response_message = f"Banned Players on {server_name}:\n```\n{formatted_ban_list}\n```"
+                await interaction.followup.send(response_message, ephemeral=True)
+            else:
+                await interaction.followup.send(f"No banned players currently on server '{server_name}'.", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to retrieve ban list for server '{server_name}'.", ephemeral=True)
+            await interaction.followup.send(f"Failed to retrieve ban list for server '{server_name}'.", ephemeral=True)
+
+    @bot.tree.command(name="findplayer", description="Find which servers a player is on right now")
+    @app_commands.describe(name="All or part of the player's name", page="The page to show, 20 matches per page (optional)")
+    @app_commands.autocomplete(name=online_player_autocomplete)
+    async def findplayer(interaction: discord.Interaction, name: str, page: int = 1):
+        await log_command(interaction, "findplayer", {"name": name, "page": page})
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Shares InspectAll with the stats poller, so this is usually answered from the snapshot cache
+        query = await query_fleet(servers, "InspectAll", command_timeout)
+        needle = name.casefold()
+        lines = []
+        for server_name, response in query.responses.items():
+            for player in response.players:
+                if player.username and needle in player.username.casefold():
+                    team = f"team {player.team_id}, " if player.team_id is not None else ""
+                    lines.append(f"**{player.username}** on {server_name} ({team}K/D/A {player.kills}/{player.deaths}/{player.assists}, score {player.score})")
+        lines.sort(key=str.casefold)
+        embed = fleet_embed(f"Players matching '{name}'", lines, page, query, "Not online on any server that answered.")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="allplayers", description="List the players on every server")
+    @app_commands.describe(page="The page to show, 20 players per page (optional)")
+    async def allplayers(interaction: discord.Interaction, page: int = 1):
+        await log_command(interaction, "allplayers", {"page": page})
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        query = await query_fleet(servers, "RefreshList", command_timeout)
+        lines = sorted((f"{player.username} ({server_name})" for server_name, response in query.responses.items() for player in response.players if player.username), key=str.casefold)
+        embed = fleet_embed(f"Players Online ({len(lines)})", lines, page, query, "No players online on any server that answered.")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="allbans", description="Show the ban lists of every server merged into one")
+    @app_commands.describe(page="The page to show, 20 bans per page (optional)")
+    async def allbans(interaction: discord.Interaction, page: int = 1):
+        await log_command(interaction, "allbans", {"page": page})
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        query = await query_fleet(servers, "banlist", command_timeout)
+        banned_on = {}
+        for server_name, response in query.responses.items():
+            for username in response.bans:
+                banned_on.setdefault(username, []).append(server_name)
+        answered = len(query.responses)
+        lines = []
+        for username in sorted(banned_on, key=str.casefold):
+            on = banned_on[username]
+            lines.append(f"{username} (all servers)" if len(on) == answered else f"{username} ({', '.join(on)})")
+        embed = fleet_embed(f"Server Ban Lists ({len(lines)} players)", lines, page, query, "No bans on any server that answered.")
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
     @bot.tree.command(name="checkunban", description="Check unban time for a specific user")
     @app_commands.describe(username="The username to check")
+    @app_commands.autocomplete(username=banned_name_autocomplete)
     async def checkunban(interaction: discord.Interaction, username: str):
         await log_command(interaction, "checkunban", {"username": username})
 
-        response = requests.get(api_url)
-        if response.status_code == 200:
-            data = json.loads(response.content.decode('utf-8'))
+        ban_details = ban_store.get(username)
+        if ban_details is not None:
+            banned_until = ban_details.get('banneduntil', 'N/A')
+            ban_reason = ban_details.get('BanReason', 'N/A')
+            await interaction.response.send_message(f"User {username} is banned until {banned_until} for reason: {ban_reason}.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"User {username} is not found in the ban list.", ephemeral=True)
 
-            if 'content' in data:
-                raw_content = b64decode(data['content']).decode('utf-8')
+    @bot.tree.command(name="bandrift", description="Show how far each server's ban list has drifted from the central ban list")
+    @app_commands.describe(refresh="Reconcile all servers now instead of showing the last result (optional)")
+    async def bandrift(interaction: discord.Interaction, refresh: bool = False):
+        await log_command(interaction, "bandrift", {"refresh": refresh})
 
-                try:
-                    banned_users = json.loads(raw_content)
-                except json.JSONDecodeError as e:
-                    await interaction.response.send_message(f"Error decoding JSON content: {e}", ephemeral=True)
-                    return
-            else:
-                await interaction.response.send_message("No 'content' field found in data.", ephemeral=True)
+        if refresh:
+            if not has_required_role(interaction.user, required_roles):
+                await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
                 return
+            await interaction.response.defer(ephemeral=True)
+            queued = outbox.counts()
+            checked = [server_name for server_name in servers if server_name not in queued]
+            progress = await FanOutProgress("Reading server ban lists", checked, lambda content: interaction.followup.send(content, ephemeral=True, wait=True)).start()
+            # Shielded: a pass that overruns keeps going in the background instead of stopping half-applied
+            reconcile_task = asyncio.ensure_future(reconciler.reconcile(on_result=progress.on_result))
+            try:
+                await asyncio.wait_for(asyncio.shield(reconcile_task), command_timeout)
+                await progress.finish("Done; results below")
+            except asyncio.TimeoutError:
+                await progress.finish(f"Still running after {command_timeout}s; results below are from the last finished pass")
+            send = interaction.followup.send
         else:
-            await interaction.response.send_message(f"Failed to retrieve data from GitHub API. Status code: {response.status_code}", ephemeral=True)
+            send = interaction.response.send_message
+
+        if reconciler.last_run is None:
+            await send("No reconciliation has run yet.", ephemeral=True)
             return
 
-        if username in banned_users:
-            ban_details = banned_users[username]
-            banned_until = ban_details.get('banneduntil', 'N/A')
-            ban_reason = ban_details.get('BanReason', 'N/A')
-            await interaction.response.send_message(f"User {username} is banned until {banned_until} for reason: {ban_reason}.", ephemeral=True)
-        else:
-            await interaction.response.send_message(f"User {username} is not found in the ban list.", ephemeral=True)
+        embed = discord.Embed(title="Ban List Drift", color=discord.Color.blue())
+        for server_name, drift in reconciler.drift.items():
+            if drift.error:
+                value = f"Error: {drift.error}"
+            elif drift.in_sync:
+                value = "In sync"
+            else:
+                value = f"Missing bans: {len(drift.missing)}\nStale bans: {len(drift.extra)}\nFixed this pass: {drift.applied}"
+                examples = (drift.missing + drift.extra)[:5]
+                value += f"\ne.g. {', '.join(examples)}"
+            embed.add_field(name=server_name, value=value[:1024], inline=True)
+        embed.set_footer(text="Last checked")
+        embed.timestamp = datetime.fromtimestamp(reconciler.last_run, timezone.utc)
+
+        await send(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="serverhealth", description="Show RCON health and queued commands for every server")
+    async def serverhealth(interaction: discord.Interaction):
+        await log_command(interaction, "serverhealth", {})
+
+        queued = outbox.counts()
+        embed = discord.Embed(title="Server Health", color=discord.Color.blue())
+        for server_name in servers:
+            server_health = health.get(server_name)
+            value = f"Circuit: {server_health.state}\nConsecutive failures: {server_health.failures}\nQueued commands: {queued.get(server_name, 0)}"
+            if server_health.last_error and server_health.failures:
+                value += f"\nLast error: {server_health.last_error}"
+            embed.add_field(name=server_name, value=value[:1024], inline=True)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="metrics", description="Show RCON, GitHub and event-loop latency and error counts")
+    async def metrics_command(interaction: discord.Interaction):
+        await log_command(interaction, "metrics", {})
+
+        if not has_required_role(interaction.user, required_roles):
+            await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+            return
+
+        def latency(histogram):
+            if histogram is None or not histogram.count:
+                return "no samples"
+            return f"p50 {histogram.quantile(0.5) * 1000:.0f}ms, p95 {histogram.quantile(0.95) * 1000:.0f}ms, max {histogram.max * 1000:.0f}ms ({histogram.count})"
+
+        metrics.collect()
+        embed = discord.Embed(title="Bot Metrics", color=discord.Color.blue())
+
+        rcon_errors = {}
+        for labels, value in metrics.items("pavlov_rcon_errors_total"):
+            rcon_errors[labels["server"]] = rcon_errors.get(labels["server"], 0) + value
+        rcon_latency = {}
+        for labels, histogram in metrics.items("pavlov_rcon_command_seconds"):
+            rcon_latency.setdefault(labels["server"], []).append(f"{labels['command']}: {latency(histogram)}")
+        for server_name in servers:
+            lines = rcon_latency.get(server_name, ["No commands sent yet"])[:5]
+            lines.append(f"Errors: {rcon_errors.get(server_name, 0)}")
+            poll_lag = metrics.get("pavlov_stats_poll_lag_seconds", {"server": server_name})
+            if poll_lag is not None:
+                lines.append(f"Stats poll lag: {poll_lag:.1f}s")
+            embed.add_field(name=server_name, value="\n".join(lines)[:1024], inline=False)
+
+        github_lines = [f"{labels['method']} {labels['status']}: {latency(histogram)}" for labels, histogram in metrics.items("pavlov_github_request_seconds")]
+        remaining = metrics.get("pavlov_github_rate_limit_remaining")
+        github_lines.append(f"Rate limit remaining: {remaining if remaining is not None else 'unknown'}")
+        github_lines.append(f"Errors: {sum(value for _, value in metrics.items('pavlov_github_errors_total'))}")
+        embed.add_field(name="GitHub", value="\n".join(github_lines)[:1024], inline=False)
+
+        embed.add_field(name="check_bans", value=latency(metrics.get("pavlov_check_bans_seconds")), inline=False)
+        embed.add_field(name="Event loop lag", value=latency(metrics.get("pavlov_event_loop_lag_seconds")), inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @bot.tree.command(name="debug", description="DONT USE UNLESS NEEDED MAY BREAK BOT")
     async def debug(interaction: discord.Interaction):
@@ -232,7 +376,16 @@ async def setup_commands(bot, servers, api_url, access_token):
         embed.add_field(name="/giveitem", value="Give an item to a player. Required role: Admin, Moderator", inline=False)
         embed.add_field(name="/players", value="Get the list of players on a server. No required role", inline=False)
         embed.add_field(name="/banlist", value="Get the ban list for a server. No required role", inline=False)
+        embed.add_field(name="/findplayer", value="Find which servers a player is on right now. No required role", inline=False)
+        embed.add_field(name="/allplayers", value="List the players on every server. No required role", inline=False)
+        embed.add_field(name="/allbans", value="Show every server's ban list merged into one. No required role", inline=False)
         embed.add_field(name="/checkunban", value="Check unban time for a specific user. No required role", inline=False)
+        embed.add_field(name="/bandrift", value="Show ban list drift per server; refresh to reconcile now. Refresh requires: Admin, Moderator", inline=False)
+        embed.add_field(name="/leaderboard", value="Show the leaderboard for Kills, KD or Deaths, 10 players per page. No required role", inline=False)
+        embed.add_field(name="/rank", value="Show a player's leaderboard rank. No required role", inline=False)
+        embed.add_field(name="/pollstatus", value="Show per-server state and lag of the stats poller. No required role", inline=False)
+        embed.add_field(name="/serverhealth", value="Show RCON health and queued ban commands per server. No required role", inline=False)
+        embed.add_field(name="/metrics", value="Show RCON, GitHub, ban check and event-loop latency and errors. Required role: Admin, Moderator", inline=False)
         embed.add_field(name="/debug", value="DONT USE UNLESS NEEDED MAY BREAK BOT. Required role: Admin, Moderator", inline=False)
         embed.add_field(name="/addmod", value="Add a player to the moderator list. Required role: Admin", inline=False)
         embed.add_field(name="/removemod", value="Remove a player from the moderator list. Required role: Admin", inline=False)
@@ -285,6 +438,7 @@ async def setup_commands(bot, servers, api_url, access_token):
 
     @bot.tree.command(name="addmod", description="Add a player to the moderator list")
     @app_commands.describe(server_name="The name of the server", unique_id="The unique ID of the player")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def addmod(interaction: discord.Interaction, server_name: str, unique_id: str):
         await log_command(interaction, "addmod", {"server_name": server_name, "unique_id": unique_id})
 
@@ -298,15 +452,16 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         addmod_command = f"AddMod {unique_id}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], addmod_command)
+        response = await send_command(interaction, server_details, addmod_command)
         if response:
-            await interaction.response.send_message(f"Player {unique_id} added to moderator list on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Player {unique_id} added to moderator list on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to add player {unique_id} to moderator list on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to add player {unique_id} to moderator list on {server_name}.", ephemeral=True)
 
 
     @bot.tree.command(name="setpin", description="Set or remove the server pin")
     @app_commands.describe(server_name="The name of the server", pin="The pin number (optional)")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def setpin(interaction: discord.Interaction, server_name: str, pin: str = None):
         await log_command(interaction, "setpin", {"server_name": server_name, "pin": pin})
 
@@ -320,15 +475,16 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         setpin_command = f"SetPin {pin}" if pin else "SetPin"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], setpin_command)
+        response = await send_command(interaction, server_details, setpin_command)
         if response:
-            await interaction.response.send_message(f"Server pin {'set' if pin else 'removed'} on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Server pin {'set' if pin else 'removed'} on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to {'set' if pin else 'remove'} server pin on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to {'set' if pin else 'remove'} server pin on {server_name}.", ephemeral=True)
 
     # Additional commands
     @bot.tree.command(name="ban", description="Ban a player from the server")
     @app_commands.describe(server_name="The name of the server", player_name="The name of the player to ban")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, player_name=online_player_autocomplete)
     async def Ban(interaction: discord.Interaction, server_name: str, player_name: str):
         await log_command(interaction, "ban", {"server_name": server_name, "player_name": player_name})
 
@@ -342,14 +498,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         ban_command = f"Ban {player_name}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], ban_command)
+        response = await send_command(interaction, server_details, ban_command)
         if response:
-            await interaction.response.send_message(f"Player {player_name} banned from {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Player {player_name} banned from {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to ban player {player_name} from {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to ban player {player_name} from {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="unban", description="Unban a player from the server")
     @app_commands.describe(server_name="The name of the server", player_name="The name of the player to unban")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, player_name=banned_name_autocomplete)
     async def Unban(interaction: discord.Interaction, server_name: str, player_name: str):
         await log_command(interaction, "unban", {"server_name": server_name, "player_name": player_name})
 
@@ -363,14 +520,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         unban_command = f"Unban {player_name}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], unban_command)
+        response = await send_command(interaction, server_details, unban_command)
         if response:
-            await interaction.response.send_message(f"Player {player_name} unbanned on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Player {player_name} unbanned on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to unban player {player_name} on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to unban player {player_name} on {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="GiveRCONplus", description="Gives RCON plus menu")
     @app_commands.describe(server_name="The name of the server", username="the username")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, username=online_player_autocomplete)
     async def GiveRCONplus(interaction: discord.Interaction, server_name: str, username: str):
         await log_command(interaction, "GiveRCONplus", {"server_name": server_name, "username": username})
 
@@ -384,14 +542,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         setpin_command = f"GiveMenu {username}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], setpin_command)
+        response = await send_command(interaction, server_details, setpin_command)
         if response:
-            await interaction.response.send_message(f"RCON plus  Given to {usermame} on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"RCON plus  Given to {usermame} on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to give RCON on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to give RCON on {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="setmaxplayers", description="Set the maximum number of players on the server")
     @app_commands.describe(server_name="The name of the server", max_players="The maximum number of players")
+    @app_commands.autocomplete(server_name=server_name_autocomplete)
     async def SetMaxPlayers(interaction: discord.Interaction, server_name: str, max_players: int):
         await log_command(interaction, "setmaxplayers", {"server_name": server_name, "max_players": max_players})
 
@@ -405,14 +564,15 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         setmaxplayers_command = f"SetMaxPlayers {max_players}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], setmaxplayers_command)
+        response = await send_command(interaction, server_details, setmaxplayers_command)
         if response:
-            await interaction.response.send_message(f"Maximum players set to {max_players} on {server_name}.\nResponse: {response}", ephemeral=True)
+            await interaction.followup.send(f"Maximum players set to {max_players} on {server_name}.\nResponse: {response}", ephemeral=True)
         else:
-            await interaction.response.send_message(f"Failed to set max players on {server_name}.", ephemeral=True)
+            await interaction.followup.send(f"Failed to set max players on {server_name}.", ephemeral=True)
 
     @bot.tree.command(name="addmod", description="Add a moderator to the server")
     @app_commands.describe(server_name="The name of the server", player_name="The name of the player to add as moderator")
+    @app_commands.autocomplete(server_name=server_name_autocomplete, player_name=online_player_autocomplete)
     async def AddMod(interaction: discord.Interaction, server_name: str, player_name: str):
         await log_command(interaction, "addmod", {"server_name": server_name, "player_name": player_name})
 
@@ -422,8 +582,8 @@ async def setup_commands(bot, servers, api_url, access_token):
             return
 
         addmod_command = f"AddMod {player_name}"
-        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], addmod_command)
-        await interaction.response.send_message(f"Response: {response}", ephemeral=True)
+        response = await send_command(interaction, server_details, addmod_command)
+        await interaction.followup.send(f"Response: {response}", ephemeral=True)
 
     
 
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+from rcon_pool import pool
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+fanout_concurrency = config.get("fanout_concurrency", 8)
+fanout_timeout = config.get("fanout_timeout", 10)
+
+class CommandResult:
+    __slots__ = ("command", "ok", "response", "error")
+
+    def __init__(self, command, ok, response=None, error=None):
+        self.command = command
+        self.ok = ok
+        self.response = response
+        self.error = error
+
+class ServerResult:
+    __slots__ = ("server_name", "commands", "elapsed")
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        self.commands = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.commands)
+
+    @property
+    def error(self):
+        for result in self.commands:
+            if not result.ok:
+                return result.error
+        return None
+
+class FanOutReport:
+    def __init__(self, commands, results):
+        self.commands = commands
+        self.results = results
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def summary(self):
+        return f"{len(self.succeeded)}/{len(self.results)} servers succeeded"
+
+    def lines(self):
+        lines = []
+        for result in self.results:
+            if result.ok:
+                lines.append(f"✅ {result.server_name} ({result.elapsed:.2f}s)")
+            else:
+                lines.append(f"❌ {result.server_name}: {result.error}")
+        return lines
+
+    def format(self):
+        return "\n".join([self.summary()] + self.lines())
+
+async def _run_server(server_name, commands, limit, timeout, on_result=None):
+    result = ServerResult(server_name)
+    async with limit:
+        started = time.monotonic()
+        for command in commands:
+            try:
+                response = await asyncio.wait_for(pool.send_to(server_name, command), timeout)
+                result.commands.append(CommandResult(command, True, response=response))
+            except asyncio.TimeoutError:
+                result.commands.append(CommandResult(command, False, error=f"timed out after {timeout}s"))
+            except Exception as e:
+                result.commands.append(CommandResult(command, False, error=str(e) or type(e).__name__))
+        result.elapsed = time.monotonic() - started
+    if on_result is not None:
+        on_result(result)
+    return result
+
+def _print_results(results):
+    for result in results:
+        for command_result in result.commands:
+            if command_result.ok:
+                print(f"Pavlov response from {result.server_name}: {command_result.response}")
+            else:
+                print(f"Failed to send Pavlov command '{command_result.command}' to {result.server_name}: {command_result.error}")
+
+async def fan_out(server_names, commands, concurrency=None, timeout=None, on_result=None):
+    """Send ``commands`` (a string or list of strings) to every server at once.
+
+    Commands for one server run in order, each bounded by ``timeout``; at most
+    ``concurrency`` servers are worked on at a time. ``on_result`` is called
+    with each ``ServerResult`` as soon as that server is done. Never raises for
+    a server failure; check the returned report instead.
+    """
+    if isinstance(commands, str):
+        commands = [commands]
+    limit = asyncio.Semaphore(concurrency or fanout_concurrency)
+    timeout = timeout or fanout_timeout
+    results = await asyncio.gather(*(_run_server(server_name, commands, limit, timeout, on_result) for server_name in server_names))
+    _print_results(results)
+    return FanOutReport(commands, results)
+
+async def fan_out_each(commands_by_server, concurrency=None, timeout=None, on_result=None):
+    """Like ``fan_out``, but with a separate command list per server."""
+    limit = asyncio.Semaphore(concurrency or fanout_concurrency)
+    timeout = timeout or fanout_timeout
+    results = await asyncio.gather(*(_run_server(server_name, commands, limit, timeout, on_result) for server_name, commands in commands_by_server.items()))
+    _print_results(results)
+    all_commands = list(dict.fromkeys(command for commands in commands_by_server.values() for command in commands))
+    return FanOutReport(all_commands, results)
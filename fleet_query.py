@@ -0,0 +1,54 @@
+import asyncio
+import time
+from snapshot_cache import snapshot_cache
+from server_health import health, OPEN
+
+class FleetQuery:
+    """One read-only command's results from every server, for merged views.
+
+    ``responses`` maps each server that answered to its typed response;
+    ``errors`` maps the rest to why they did not, in ``servers.json`` order.
+    """
+
+    __slots__ = ("command", "responses", "errors", "elapsed")
+
+    def __init__(self, command):
+        self.command = command
+        self.responses = {}
+        self.errors = {}
+        self.elapsed = 0.0
+
+    def summary(self):
+        answered = len(self.responses)
+        return f"{answered}/{answered + len(self.errors)} servers answered in {self.elapsed:.2f}s"
+
+    def error_lines(self):
+        return [f"❌ {server_name}: {error}" for server_name, error in self.errors.items()]
+
+async def _query_server(server_name, command, timeout):
+    try:
+        return await asyncio.wait_for(snapshot_cache.get(server_name, command), timeout)
+    except asyncio.TimeoutError:
+        return f"timed out after {timeout}s"
+
+async def query_fleet(server_names, command, timeout):
+    """Send ``command`` to every server at once, going through the snapshot cache.
+
+    All servers are asked concurrently, so the whole query takes about as long
+    as the slowest server (at most ``timeout``) rather than the sum of them,
+    and a result another command fetched moments ago is reused.
+    """
+    query = FleetQuery(command)
+    started = time.monotonic()
+    server_names = list(server_names)
+    results = await asyncio.gather(*(_query_server(server_name, command, timeout) for server_name in server_names))
+    query.elapsed = time.monotonic() - started
+    for server_name, result in zip(server_names, results):
+        if isinstance(result, str):
+            query.errors[server_name] = result
+        elif result is None:
+            server_health = health.get(server_name)
+            query.errors[server_name] = "circuit open" if server_health.state == OPEN else server_health.last_error or "no response"
+        else:
+            query.responses[server_name] = result
+    return query
@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+from base64 import b64decode, b64encode
+import aiohttp
+from metrics import metrics
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+access_token = config["access_token"]
+github_timeout = config.get("github_timeout", 15)
+github_retries = config.get("github_retries", 3)
+github_rate = config.get("github_rate", 1.0)
+github_burst = config.get("github_burst", 10)
+github_reserve = config.get("github_reserve", 200)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Request priorities; lower goes first
+WRITE = 0
+READ = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {WRITE: "write", READ: "read", BACKGROUND: "background"}
+
+class GitHubError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+class RateLimiter:
+    """Schedules every GitHub request against a token bucket and GitHub's own limits.
+
+    Requests wait in a priority queue, so a queued write always goes before a
+    queued read. The bucket refills at ``rate`` requests per second up to
+    ``burst``. Nothing is sent while a ``Retry-After`` is pending or the
+    quota is used up until its reset. Once ``X-RateLimit-Remaining`` is at or
+    below ``reserve``, background reads are refused with a 429 ``GitHubError``
+    so the rest of the quota is kept for writes.
+    """
+
+    def __init__(self, rate=1.0, burst=10, reserve=200):
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self._waiters = []
+        self._order = itertools.count()
+        self._dispatcher = None
+
+    def low(self):
+        """True while the remaining quota is held back for writes."""
+        return self.remaining is not None and self.remaining <= self.reserve and self.reset_at is not None and time.time() < self.reset_at
+
+    def counts(self):
+        """Requests waiting right now, by priority name."""
+        counts = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+        for priority, _, waiter in self._waiters:
+            if not waiter.done():
+                counts[PRIORITY_NAMES[priority]] += 1
+        return counts
+
+    def update(self, headers):
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None and remaining.isdigit():
+            self.remaining = int(remaining)
+        reset = headers.get('X-RateLimit-Reset')
+        if reset is not None and reset.isdigit():
+            self.reset_at = int(reset)
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None and retry_after.isdigit():
+            self.blocked_until = max(self.blocked_until, time.monotonic() + int(retry_after))
+
+    def _delay(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        delay = self.blocked_until - now
+        if self.remaining == 0 and self.reset_at is not None:
+            delay = max(delay, self.reset_at - time.time())
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return max(0.0, delay)
+
+    async def acquire(self, priority):
+        if priority == BACKGROUND and self.low():
+            raise GitHubError(f"GitHub quota is down to {self.remaining}; background reads are paused until it resets", 429)
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await waiter
+
+    async def _dispatch(self):
+        while self._waiters:
+            delay = self._delay()
+            if delay > 0:
+                # Re-checked after the sleep, so a write queued meanwhile still goes first
+                await asyncio.sleep(delay)
+                continue
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self.tokens -= 1
+            waiter.set_result(None)
+
+class GitHubClient:
+    """Async GitHub REST client sharing one keep-alive session for the whole bot.
+
+    Every request goes through ``limiter``. Writes (anything but GET) are sent
+    first; GETs are reads unless the caller marks them ``BACKGROUND``.
+    """
+
+    def __init__(self, access_token, timeout=15, retries=3, backoff=1.0, limiter=None):
+        self.access_token = access_token
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = limiter or RateLimiter()
+        self._session = None
+
+    def session(self):
+        if self._session is None or self._session.closed:
+            headers = {
+                'Accept': 'application/vnd.github+json',
+                'User-Agent': 'PavlovBanSystem',
+            }
+            if self.access_token:
+                headers['Authorization'] = f'token {self.access_token}'
+            self._session = aiohttp.ClientSession(headers=headers, timeout=self.timeout)
+        return self._session
+
+    async def request(self, method, url, priority=None, **kwargs):
+        """Return ``(status, headers, body)``; body is parsed JSON when possible.
+
+        Connection errors, timeouts, 429, 5xx and quota-exhausted 403
+        responses are retried with exponential backoff (and never before
+        GitHub's ``Retry-After``); anything else is returned to the caller
+        as-is.
+        """
+        if priority is None:
+            priority = READ if method == 'GET' else WRITE
+        attempt = 0
+        while True:
+            await self.limiter.acquire(priority)
+            started = time.monotonic()
+            try:
+                async with self.session().request(method, url, **kwargs) as response:
+                    text = await response.text()
+                    status, headers = response.status, response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.observe("pavlov_github_request_seconds", time.monotonic() - started, {"method": method, "status": "error"})
+                metrics.inc("pavlov_github_errors_total", {"method": method, "error": type(e).__name__})
+                if attempt >= self.retries:
+                    raise GitHubError(f"GitHub {method} {url} failed: {e}") from e
+            else:
+                metrics.observe("pavlov_github_request_seconds", time.monotonic() - started, {"method": method, "status": str(status)})
+                self._record_rate_limit(headers)
+                throttled = status == 403 and (headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in headers)
+                if status in RETRY_STATUSES or throttled:
+                    metrics.inc("pavlov_github_errors_total", {"method": method, "error": str(status)})
+                if (status not in RETRY_STATUSES and not throttled) or attempt >= self.retries:
+                    try:
+                        body = json.loads(text) if text else None
+                    except json.JSONDecodeError:
+                        body = text
+                    return status, headers, body
+            attempt += 1
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1) + random.uniform(0, self.backoff))
+
+    def _record_rate_limit(self, headers):
+        self.limiter.update(headers)
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None and remaining.isdigit():
+            metrics.set("pavlov_github_rate_limit_remaining", int(remaining))
+        reset = headers.get('X-RateLimit-Reset')
+        if reset is not None and reset.isdigit():
+            metrics.set("pavlov_github_rate_limit_reset_timestamp", int(reset))
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+github = GitHubClient(access_token, timeout=github_timeout, retries=github_retries, limiter=RateLimiter(rate=github_rate, burst=github_burst, reserve=github_reserve))
+
+def decode_ban_file(data):
+    if not isinstance(data, dict) or 'content' not in data:
+        raise GitHubError("No 'content' field found in data.", 200)
+    raw_content = b64decode(data['content']).decode('utf-8')
+    try:
+        return json.loads(raw_content) if raw_content.strip() else {}
+    except json.JSONDecodeError as e:
+        raise GitHubError(f"Error decoding JSON content: {e}", 200) from e
+
+async def update_github_file(api_url, content, commit_message, sha=None):
+    """Write ``content`` to the ban file and return the new blob sha."""
+    if sha is None:
+        status, headers, data = await github.request('GET', api_url, priority=WRITE)
+        sha = data.get('sha', '') if status == 200 and isinstance(data, dict) else ''
+
+    payload = {
+        'message': commit_message,
+        'content': b64encode(json.dumps(content, indent=4).encode('utf-8')).decode('utf-8'),
+    }
+    if sha:
+        payload['sha'] = sha
+
+    status, headers, data = await github.request('PUT', api_url, json=payload)
+    if status not in (200, 201):
+        raise GitHubError(f"Failed to update {api_url}. Status code: {status}: {data}", status)
+    print(f"GitHub file updated: {commit_message}")
+    return data['content']['sha']
@@ -0,0 +1,82 @@
+from array import array
+from bisect import bisect_left
+from stats_store import kd_ratio
+
+CATEGORIES = ("Kills", "KD", "Deaths")
+
+# Keys pack (-value, player_id) into one int64: up to 16M players, KD to 3 decimals
+ID_SPACE = 1 << 24
+KD_SCALE = 1000
+
+def category_values(kills, deaths):
+    return {"Kills": kills, "Deaths": deaths, "KD": kd_ratio(kills, deaths)}
+
+class RankIndex:
+    """Players kept in rank order for one stat, updated one player at a time.
+
+    Each entry is a single int64 in a sorted ``array('q')`` encoding the
+    negated value and the player id, so the best player is first, ties go to
+    the player seen first, and the index costs 8 bytes per player. An update
+    is two binary searches; top-N, paging and rank lookups never sort.
+    """
+
+    def __init__(self, scale=1):
+        self.scale = scale
+        self._keys = array('q')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _key(self, player_id, value):
+        return -round(value * self.scale) * ID_SPACE + player_id
+
+    def update(self, player_id, old, new):
+        if old is not None:
+            old_key = self._key(player_id, old)
+            new_key = self._key(player_id, new)
+            if old_key == new_key:
+                return
+            del self._keys[bisect_left(self._keys, old_key)]
+        else:
+            new_key = self._key(player_id, new)
+        self._keys.insert(bisect_left(self._keys, new_key), new_key)
+
+    def rebuild(self, values):
+        """Bulk-load ``{player_id: value}`` with one sort, e.g. after a restart."""
+        self._keys = array('q', sorted(self._key(player_id, value) for player_id, value in values.items()))
+
+    def page(self, offset=0, limit=10):
+        return [key % ID_SPACE for key in self._keys[offset:offset + limit]]
+
+    def rank(self, player_id, value):
+        return bisect_left(self._keys, self._key(player_id, value)) + 1
+
+class Leaderboard:
+    def __init__(self, store):
+        self.store = store
+        self.indexes = {category: RankIndex(KD_SCALE if category == "KD" else 1) for category in CATEGORIES}
+
+    def update(self, player_id, old):
+        """Re-rank a player after their totals changed from ``old`` (``None`` if new)."""
+        old_values = category_values(*old) if old is not None else {}
+        new_values = category_values(self.store.kills[player_id], self.store.deaths[player_id])
+        for category, index in self.indexes.items():
+            index.update(player_id, old_values.get(category), new_values[category])
+
+    def rebuild(self):
+        store = self.store
+        for category, index in self.indexes.items():
+            index.rebuild({player_id: category_values(store.kills[player_id], store.deaths[player_id])[category] for player_id in range(len(store))})
+
+    def page(self, category, page=1, per_page=10):
+        store = self.store
+        return [(store.names[player_id], store.get(store.names[player_id])[category]) for player_id in self.indexes[category].page((page - 1) * per_page, per_page)]
+
+    def rank(self, category, username):
+        stats = self.store.get(username)
+        if stats is None:
+            return None
+        return self.indexes[category].rank(self.store.ids[username], stats[category])
+
+    def total(self, category):
+        return len(self.indexes[category])
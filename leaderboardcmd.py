@@ -1,10 +1,14 @@
 import asyncio
 import json
-import requests
-from base64 import b64decode
 import discord
 from discord import app_commands
-from pavlov import PavlovRCON
+from snapshot_cache import snapshot_cache
+from leaderboard_index import Leaderboard, CATEGORIES
+from stats_ingest import StatsIngest
+from stats_store import StatsStore
+from stats_poller import StatsPoller
+from rcon_types import PlayerList
+from audit_log import log_command
 
 # Load configuration
 with open('config.json') as config_file:
@@ -12,80 +16,102 @@ with open('config.json') as config_file:
 
 api_url = f'https://api.github.com/repos/{config["github_username"]}/{config["repo_name"]}/contents/{config["file_path"]}'
 access_token = config["access_token"]
-log_channel_id = config["log_channel_id"]
+stats_poll_interval = config.get("stats_poll_interval", 60)
+stats_idle_interval = config.get("stats_idle_interval", 300)
+stats_offline_interval = config.get("stats_offline_interval", 600)
+stats_path = config.get("stats_path", "stats")
+stats_wal_max = config.get("stats_wal_max", 10000)
 
 # Load server details from JSON file
 with open('servers.json') as f:
     servers = json.load(f)
 
-player_stats = {}
+# Restored from the last snapshot plus the write-ahead log
+player_stats = StatsStore(stats_path, wal_max=stats_wal_max)
+player_stats.load()
+leaderboard_index = Leaderboard(player_stats)
+leaderboard_index.rebuild()
+stats_ingest = StatsIngest()
 
 def get_server_details(server_name):
     return servers.get(server_name)
 
-async def send_pavlov_command(host, port, password, command):
-    try:
-        pavlov = PavlovRCON(host, port, password)
-        task = asyncio.create_task(pavlov.send(command))
-        response = await task
-        print(f"Pavlov response: {response}")
-        return response if isinstance(response, str) else json.dumps(response)
-    except Exception as e:
-        print(f"Failed to send Pavlov command: {e}")
+def record_player_stats(username, kills, deaths):
+    player_id, old = player_stats.record(username, kills, deaths)
+    leaderboard_index.update(player_id, old)
+
+async def poll_server_stats(server_name, server_details):
+    info_response, inspect_response = await asyncio.gather(
+        snapshot_cache.get(server_name, "ServerInfo"),
+        snapshot_cache.get(server_name, "InspectAll"),
+    )
+    if not info_response or not inspect_response:
         return None
 
+    # InspectAll already names everyone online, so /players can answer from it
+    snapshot_cache.put(server_name, "RefreshList", PlayerList.from_players(inspect_response.players))
+
+    # Only what changed since the last poll is added to the totals
+    for username, kills, deaths in stats_ingest.ingest(server_name, info_response.map_label, inspect_response.players):
+        record_player_stats(username, kills, deaths)
+    player_stats.flush()
+    return len(inspect_response.players)
+
+stats_poller = StatsPoller(servers, poll_server_stats, live_interval=stats_poll_interval, idle_interval=stats_idle_interval, offline_interval=stats_offline_interval)
+
 async def update_player_stats():
-    global player_stats
-    while True:
-        for server_name, server_details in servers.items():
-            response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], "RefreshList")
-            if response:
-                try:
-                    player_list_data = json.loads(response)
-                    player_list = player_list_data.get('PlayerList', [])
-                    for player in player_list:
-                        username = player['Username']
-                        if username not in player_stats:
-                            player_stats[username] = {
-                                "Kills": 0,
-                                "Deaths": 0,
-                                "KD": 0.0
-                            }
-                        player_stats[username]["Kills"] += player.get("Kills", 0)
-                        player_stats[username]["Deaths"] += player.get("Deaths", 0)
-                        if player_stats[username]["Deaths"] > 0:
-                            player_stats[username]["KD"] = player_stats[username]["Kills"] / player_stats[username]["Deaths"]
-                        else:
-                            player_stats[username]["KD"] = player_stats[username]["Kills"]
-                except json.JSONDecodeError:
-                    print("Failed to parse player list response.")
-        await asyncio.sleep(60)
-
-async def log_command(interaction, command_name, args):
-    log_channel = interaction.guild.get_channel(log_channel_id)
-    if log_channel:
-        embed = discord.Embed(title="Command Used", color=discord.Color.blue())
-        embed.add_field(name="User", value=interaction.user.mention, inline=True)
-        embed.add_field(name="Command", value=command_name, inline=True)
-        embed.add_field(name="Arguments", value=str(args), inline=True)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
-        embed.add_field(name="Timestamp", value=interaction.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=True)
-        await log_channel.send(embed=embed)
+    # One independent task per server; see stats_poller.py
+    await stats_poller.run()
 
 async def setup_leaderboard_commands(bot):
     @bot.tree.command(name="leaderboard", description="Get the leaderboard for a specific category")
-    @app_commands.describe(category="The category for the leaderboard (Kills, KD)")
-    async def leaderboard(interaction: discord.Interaction, category: str):
-        await log_command(interaction, "leaderboard", {"category": category})
+    @app_commands.describe(category="The category for the leaderboard (Kills, KD, Deaths)", page="The page to show, 10 players per page (optional)")
+    async def leaderboard(interaction: discord.Interaction, category: str, page: int = 1):
+        await log_command(interaction, "leaderboard", {"category": category, "page": page})
 
-        if category not in ["Kills", "KD"]:
-            await interaction.response.send_message("Invalid category. Please choose either 'Kills' or 'KD'.", ephemeral=True)
+        if category not in CATEGORIES:
+            await interaction.response.send_message("Invalid category. Please choose 'Kills', 'KD' or 'Deaths'.", ephemeral=True)
             return
 
-        sorted_stats = sorted(player_stats.items(), key=lambda x: x[1][category], reverse=True)[:10]
+        page = max(page, 1)
+        top_stats = leaderboard_index.page(category, page)
+        total_pages = max(1, -(-leaderboard_index.total(category) // 10))
 
         embed = discord.Embed(title=f"Leaderboard - {category}", color=discord.Color.gold())
-        for i, (username, stats) in enumerate(sorted_stats, start=1):
-            embed.add_field(name=f"{i}. {username}", value=f"{category}: {stats[category]}", inline=False)
+        for i, (username, value) in enumerate(top_stats, start=(page - 1) * 10 + 1):
+            embed.add_field(name=f"{i}. {username}", value=f"{category}: {value}", inline=False)
+        embed.set_footer(text=f"Page {page}/{total_pages}")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="pollstatus", description="Show how the leaderboard stats poller is keeping up")
+    async def pollstatus(interaction: discord.Interaction):
+        await log_command(interaction, "pollstatus", {})
+
+        embed = discord.Embed(title="Stats Poller Status", color=discord.Color.blue())
+        for server_name, state in stats_poller.states.items():
+            if state.last_poll is None:
+                value = "Not polled yet"
+            else:
+                value = (f"State: {state.state}\nEvery {state.interval:.0f}s, last poll took {state.last_duration:.2f}s\n"
+                         f"Lag: {state.lag:.1f}s\nLast poll: <t:{int(state.last_poll)}:R>")
+            embed.add_field(name=server_name, value=value, inline=True)
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="rank", description="Get a player's leaderboard rank")
+    @app_commands.describe(username="The name of the player", category="The category for the leaderboard (Kills, KD, Deaths)")
+    async def rank(interaction: discord.Interaction, username: str, category: str = "Kills"):
+        await log_command(interaction, "rank", {"username": username, "category": category})
+
+        if category not in CATEGORIES:
+            await interaction.response.send_message("Invalid category. Please choose 'Kills', 'KD' or 'Deaths'.", ephemeral=True)
+            return
+
+        position = leaderboard_index.rank(category, username)
+        if position is None:
+            await interaction.response.send_message(f"No stats recorded for {username}.", ephemeral=True)
+            return
+
+        value = player_stats.get(username)[category]
+        await interaction.response.send_message(f"{username} is ranked #{position} of {leaderboard_index.total(category)} for {category} ({value}).", ephemeral=True)
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from aiohttp import web
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+metrics_host = config.get("metrics_host", "127.0.0.1")
+metrics_port = config.get("metrics_port")
+metrics_path = config.get("metrics_path")
+metrics_interval = config.get("metrics_interval", 15)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (0 if empty)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+class Metrics:
+    """In-process counters, gauges and latency histograms.
+
+    Series are keyed by metric name and a sorted tuple of label pairs.
+    ``collectors`` are called before every render so gauges that are cheap to
+    read on demand (queue depths, store sizes) need no bookkeeping of their
+    own. ``render()`` produces the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.kinds = {}
+        self.help = {}
+        self.series = {}
+        self.collectors = []
+
+    def describe(self, name, kind, help_text):
+        self.kinds[name] = kind
+        self.help[name] = help_text
+        self.series.setdefault(name, {})
+
+    def _labels(self, labels):
+        return tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name, labels=None, value=1):
+        series = self.series[name]
+        key = self._labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        self.series[name][self._labels(labels)] = value
+
+    def observe(self, name, value, labels=None):
+        series = self.series[name]
+        key = self._labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def get(self, name, labels=None):
+        return self.series[name].get(self._labels(labels))
+
+    def items(self, name):
+        return [(dict(key), value) for key, value in self.series[name].items()]
+
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+    def render(self):
+        self.collect()
+        lines = []
+        for name, series in self.series.items():
+            kind = self.kinds[name]
+            lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in series.items():
+                if kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(value.buckets, value.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {value.count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(value.sum)}")
+                lines.append(f"{name}_count{_format_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(key):
+    if not key:
+        return ""
+    pairs = []
+    for label, value in key:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{label}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+metrics = Metrics()
+metrics.describe("pavlov_rcon_command_seconds", "histogram", "RCON command latency by server and command, from when a connection slot is free.")
+metrics.describe("pavlov_rcon_errors_total", "counter", "Failed RCON commands by server, command and error.")
+metrics.describe("pavlov_github_request_seconds", "histogram", "GitHub API request latency by method and status.")
+metrics.describe("pavlov_github_errors_total", "counter", "GitHub API requests that failed or were throttled.")
+metrics.describe("pavlov_github_rate_limit_remaining", "gauge", "GitHub API requests left in the current rate limit window.")
+metrics.describe("pavlov_github_rate_limit_reset_timestamp", "gauge", "Unix time the GitHub rate limit window resets.")
+metrics.describe("pavlov_github_queued", "gauge", "GitHub requests waiting for the rate limiter, by priority.")
+metrics.describe("pavlov_check_bans_seconds", "histogram", "Duration of each expired-ban check.")
+metrics.describe("pavlov_bans_lifted_total", "counter", "Bans lifted because their time ran out.")
+metrics.describe("pavlov_stats_poll_lag_seconds", "gauge", "How late the last stats poll of a server started.")
+metrics.describe("pavlov_stats_poll_seconds", "histogram", "Duration of stats polls by server.")
+metrics.describe("pavlov_event_loop_lag_seconds", "histogram", "How late the event loop woke a timer, a sign of blocking work.")
+metrics.describe("pavlov_bans", "gauge", "Bans currently held in the ban store.")
+metrics.describe("pavlov_outbox_queued", "gauge", "Ban and unban commands waiting for an offline server.")
+
+async def monitor_event_loop(interval=1.0):
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        metrics.observe("pavlov_event_loop_lag_seconds", max(0.0, time.monotonic() - started - interval))
+
+async def handle_metrics(request):
+    return web.Response(text=metrics.render(), content_type='text/plain', charset='utf-8', headers={'X-Content-Type-Options': 'nosniff'})
+
+def write_metrics_file(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(metrics.render())
+    os.replace(tmp_path, path)
+
+async def run_metrics():
+    """Watch event-loop lag and expose ``metrics`` over HTTP and/or a file.
+
+    The ``/metrics`` endpoint is only served when ``metrics_port`` is set, and
+    the text file is only written when ``metrics_path`` is set.
+    """
+    tasks = [asyncio.create_task(monitor_event_loop())]
+    runner = None
+    if metrics_port:
+        app = web.Application()
+        app.router.add_get('/metrics', handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, metrics_host, metrics_port).start()
+        print(f"Serving metrics on http://{metrics_host}:{metrics_port}/metrics")
+    try:
+        while True:
+            if metrics_path:
+                try:
+                    write_metrics_file(metrics_path)
+                except OSError as e:
+                    print(f"Failed to write metrics to {metrics_path}: {e}")
+            await asyncio.sleep(metrics_interval)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if runner is not None:
+            await runner.cleanup()
@@ -0,0 +1,82 @@
+from bisect import bisect_left
+
+class PrefixIndex:
+    """Names kept sorted by their case-folded form for prefix lookups.
+
+    Entries are ``(folded, name)`` tuples in one sorted list, so a lookup is
+    a binary search to the first match followed by a short scan, and adding
+    or removing a name is a binary search and a list insert. Matching ignores
+    case; names that differ only in case are kept apart.
+    """
+
+    def __init__(self, names=()):
+        self.rebuild(names)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, name):
+        key = (name.casefold(), name)
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def rebuild(self, names):
+        self._keys = sorted({(name.casefold(), name) for name in names})
+
+    def add(self, name):
+        key = (name.casefold(), name)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            self._keys.insert(i, key)
+
+    def discard(self, name):
+        key = (name.casefold(), name)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def search(self, prefix, limit=25):
+        """Return up to ``limit`` names starting with ``prefix``, in order."""
+        prefix = prefix.casefold()
+        matches = []
+        for i in range(bisect_left(self._keys, (prefix,)), len(self._keys)):
+            folded, name = self._keys[i]
+            if not folded.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+class OnlinePlayers:
+    """Who was on each server in its latest player list, searchable by prefix.
+
+    ``update`` is given a server's whole player list and applies only the
+    difference from the previous one. A name online on several servers stays
+    in the fleet-wide index until it has left all of them.
+    """
+
+    def __init__(self):
+        self.by_server = {}
+        self.all = PrefixIndex()
+        self._players = {}
+        self._holders = {}
+
+    def update(self, server_name, names):
+        index = self.by_server.setdefault(server_name, PrefixIndex())
+        current = self._players.get(server_name, set())
+        names = set(names)
+        for name in current - names:
+            index.discard(name)
+            holders = self._holders[name]
+            holders.discard(server_name)
+            if not holders:
+                del self._holders[name]
+                self.all.discard(name)
+        for name in names - current:
+            index.add(name)
+            self._holders.setdefault(name, set()).add(server_name)
+            self.all.add(name)
+        self._players[server_name] = names
+
+    def search(self, prefix, server_name=None, limit=25):
+        index = self.all if server_name is None else self.by_server.get(server_name)
+        return index.search(prefix, limit) if index is not None else []
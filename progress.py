@@ -0,0 +1,65 @@
+import asyncio
+import time
+import discord
+
+class FanOutProgress:
+    """One Discord message that fills in as each server reports back.
+
+    ``send`` is a coroutine function that posts the first version of the
+    message and returns it (``channel.send``, or an interaction follow-up with
+    ``wait=True``). Pass ``on_result`` to ``fan_out`` / ``outbox.deliver``;
+    edits are coalesced to at most one every ``min_interval`` seconds so a
+    large fleet does not run into Discord's edit rate limit.
+    """
+
+    def __init__(self, title, server_names, send, min_interval=1.0):
+        self.title = title
+        self.server_names = list(server_names)
+        self.send = send
+        self.min_interval = min_interval
+        self.results = {}
+        self.message = None
+        self._last_edit = 0.0
+        self._edit_task = None
+
+    def render(self, summary=None):
+        lines = [f"**{self.title}**", summary or f"{len(self.results)}/{len(self.server_names)} servers done"]
+        for server_name in self.server_names:
+            result = self.results.get(server_name)
+            if result is None:
+                lines.append(f"⏳ {server_name}")
+            elif result.ok:
+                lines.append(f"✅ {server_name} ({result.elapsed:.2f}s)")
+            else:
+                lines.append(f"❌ {server_name}: {result.error}")
+        content = "\n".join(lines)
+        return content if len(content) <= 2000 else content[:1997] + "..."
+
+    async def start(self):
+        self.message = await self.send(self.render())
+        self._last_edit = time.monotonic()
+        return self
+
+    def on_result(self, result):
+        self.results[result.server_name] = result
+        if self.message is not None and self._edit_task is None:
+            self._edit_task = asyncio.create_task(self._edit_later())
+
+    async def _edit_later(self):
+        await asyncio.sleep(max(0.0, self._last_edit + self.min_interval - time.monotonic()))
+        self._edit_task = None
+        await self._edit(self.render())
+
+    async def _edit(self, content):
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException as e:
+            print(f"Failed to update progress message: {e}")
+
+    async def finish(self, summary=None):
+        if self._edit_task is not None:
+            self._edit_task.cancel()
+            self._edit_task = None
+        if self.message is not None:
+            await self._edit(self.render(summary))
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import time
+from pavlov import PavlovRCON
+from server_health import health, CircuitOpenError
+from metrics import metrics
+from rcon_types import parse_response
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+# Load server details from JSON file
+with open('servers.json') as f:
+    servers = json.load(f)
+
+rcon_max_connections = config.get("rcon_max_connections", 2)
+rcon_timeout = config.get("rcon_timeout", 5)
+
+class RconPool:
+    """Keeps authenticated PavlovRCON sessions open per server and reuses them.
+
+    Each server gets at most ``max_connections`` sockets; a command waits for a
+    free one, so that is also the cap on in-flight commands per server.
+    Outcomes feed the server's circuit breaker, and a server whose circuit is
+    open fails immediately with ``CircuitOpenError``. Replies come back as
+    typed ``rcon_types`` results, parsed once here.
+    """
+
+    def __init__(self, servers, max_connections=2, timeout=5):
+        self.servers = servers
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle = {}
+        self._limits = {}
+
+    def _key(self, host, port):
+        return (host, int(port))
+
+    def server_name(self, host, port):
+        key = self._key(host, port)
+        for server_name, server_details in self.servers.items():
+            if self._key(server_details['ip'], server_details['port']) == key:
+                return server_name
+        return f"{host}:{port}"
+
+    def _limit(self, key):
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.max_connections)
+        return limit
+
+    async def _acquire(self, key, host, port, password):
+        idle = self._idle.setdefault(key, [])
+        while idle:
+            rcon = idle.pop()
+            if rcon.is_connected():
+                return rcon, True
+        rcon = PavlovRCON(host, port, password, timeout=self.timeout)
+        await rcon.open()
+        return rcon, False
+
+    async def _discard(self, rcon):
+        try:
+            await rcon.close()
+        except Exception:
+            pass
+
+    async def send(self, host, port, password, command):
+        server_name = self.server_name(host, port)
+        # Only the verb is a label; arguments such as player names would make one series per player
+        labels = {"server": server_name, "command": command.split(' ', 1)[0].lower()}
+        response = await self._send(host, port, password, command, server_name, labels)
+        return parse_response(command, response)
+
+    async def _send(self, host, port, password, command, server_name, labels):
+        key = self._key(host, port)
+        async with self._limit(key):
+            # Checked and accounted only once a slot is held: a caller giving up
+            # while queued says nothing about the server's health, and must not
+            # leave a half-open probe behind that never reports back
+            try:
+                health.check(server_name)
+            except CircuitOpenError:
+                metrics.inc("pavlov_rcon_errors_total", dict(labels, error="circuit_open"))
+                raise
+            started = time.monotonic()
+            try:
+                response = await self._exchange(key, host, port, password, command)
+            except BaseException as e:
+                # Includes cancellation, which is how a caller's deadline ends the call
+                timed_out = isinstance(e, asyncio.CancelledError)
+                metrics.inc("pavlov_rcon_errors_total", dict(labels, error="timeout" if timed_out else type(e).__name__))
+                health.record_failure(server_name, e if not timed_out else "timed out")
+                raise
+            finally:
+                metrics.observe("pavlov_rcon_command_seconds", time.monotonic() - started, labels)
+        health.record_success(server_name)
+        return response
+
+    async def _exchange(self, key, host, port, password, command):
+        while True:
+            rcon, reused = await self._acquire(key, host, port, password)
+            try:
+                response = await rcon.send(command)
+            except asyncio.CancelledError:
+                # A reply may still arrive on this socket, so it cannot be reused
+                if rcon.writer:
+                    rcon.writer.close()
+                raise
+            except asyncio.TimeoutError:
+                # The command went out and the reply is just slow; sending it again
+                # could run it twice (GiveCash, Kill, ban...)
+                await self._discard(rcon)
+                raise
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                await self._discard(rcon)
+                if reused:
+                    # The server dropped the idle session before the command got there; retry on a fresh one
+                    continue
+                raise
+            except Exception:
+                await self._discard(rcon)
+                raise
+            if response == "":
+                # An empty read means the server closed the socket on us
+                await self._discard(rcon)
+                if reused:
+                    continue
+                raise ConnectionResetError(f"{host}:{port} closed the RCON connection")
+            self._idle[key].append(rcon)
+            return response
+
+    async def send_to(self, server_name, command):
+        server_details = self.servers[server_name]
+        return await self.send(server_details['ip'], server_details['port'], server_details['password'], command)
+
+    async def warm_up(self):
+        async def open_one(server_details):
+            key = self._key(server_details['ip'], server_details['port'])
+            async with self._limit(key):
+                if self._idle.get(key):
+                    return
+                rcon, _ = await self._acquire(key, server_details['ip'], server_details['port'], server_details['password'])
+                self._idle[key].append(rcon)
+
+        results = await asyncio.gather(*(open_one(details) for details in self.servers.values()), return_exceptions=True)
+        for server_name, result in zip(self.servers, results):
+            if isinstance(result, Exception):
+                print(f"Failed to open RCON connection to {server_name}: {result}")
+
+    async def close(self):
+        for idle in self._idle.values():
+            while idle:
+                await self._discard(idle.pop())
+
+pool = RconPool(servers, max_connections=rcon_max_connections, timeout=rcon_timeout)
+
+async def send_pavlov_command(host, port, password, command):
+    try:
+        response = await pool.send(host, port, password, command)
+        print(f"Pavlov response: {response}")
+        return response
+    except Exception as e:
+        print(f"Failed to send Pavlov command: {e}")
+        return None
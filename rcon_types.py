@@ -0,0 +1,110 @@
+import json
+
+def parse_kda(kda):
+    """Split Pavlov's ``"kills/deaths/assists"`` string into three ints."""
+    parts = str(kda).split('/')
+    try:
+        return int(parts[0]), int(parts[1]), int(parts[2]) if len(parts) > 2 else 0
+    except (ValueError, IndexError):
+        return 0, 0, 0
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+class RconResponse:
+    """A parsed RCON reply. ``raw`` is what the server sent (a dict, or a
+    string for non-JSON replies); ``str()`` gives the same text the bot used
+    to show, so formatters can keep printing it as-is."""
+
+    __slots__ = ("command", "raw")
+
+    def __init__(self, command, raw):
+        self.command = command
+        self.raw = raw
+
+    @property
+    def successful(self):
+        return isinstance(self.raw, dict) and self.raw.get('Successful', True) is not False
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default) if isinstance(self.raw, dict) else default
+
+    def __str__(self):
+        return self.raw if isinstance(self.raw, str) else json.dumps(self.raw)
+
+class Player:
+    __slots__ = ("username", "unique_id")
+
+    def __init__(self, username, unique_id=None):
+        self.username = username
+        self.unique_id = unique_id
+
+class PlayerList(RconResponse):
+    __slots__ = ("players",)
+
+    def __init__(self, command, raw):
+        super().__init__(command, raw)
+        self.players = tuple(Player(entry.get('Username'), entry.get('UniqueId')) for entry in self.get('PlayerList') or [] if isinstance(entry, dict))
+
+    @classmethod
+    def from_players(cls, players):
+        return cls("RefreshList", {"Command": "RefreshList", "PlayerList": [{"Username": player.username, "UniqueId": player.unique_id} for player in players], "Successful": True})
+
+class BanList(RconResponse):
+    __slots__ = ("bans",)
+
+    def __init__(self, command, raw):
+        super().__init__(command, raw)
+        self.bans = frozenset(self.get('BanList') or [])
+
+class InspectedPlayer:
+    __slots__ = ("username", "unique_id", "kills", "deaths", "assists", "team_id", "cash", "score")
+
+    def __init__(self, entry):
+        self.username = entry.get('PlayerName') or entry.get('Username')
+        self.unique_id = entry.get('UniqueId')
+        self.kills, self.deaths, self.assists = parse_kda(entry.get('KDA', '0/0/0'))
+        self.team_id = _int(entry.get('TeamId'), None)
+        self.cash = _int(entry.get('Cash'))
+        self.score = _int(entry.get('Score'))
+
+class InspectList(RconResponse):
+    __slots__ = ("players",)
+
+    def __init__(self, command, raw):
+        super().__init__(command, raw)
+        entries = self.get('InspectList')
+        if entries is None and isinstance(self.get('PlayerInfo'), dict):
+            entries = [self.get('PlayerInfo')]
+        self.players = tuple(InspectedPlayer(entry) for entry in entries or [] if isinstance(entry, dict))
+
+class ServerInfo(RconResponse):
+    __slots__ = ("map_label", "game_mode", "server_name", "round_state", "player_count", "max_players")
+
+    def __init__(self, command, raw):
+        super().__init__(command, raw)
+        info = self.get('ServerInfo') or {}
+        self.map_label = info.get('MapLabel')
+        self.game_mode = info.get('GameMode')
+        self.server_name = info.get('ServerName')
+        self.round_state = info.get('RoundState')
+        player_count, _, max_players = str(info.get('PlayerCount', '')).partition('/')
+        self.player_count = _int(player_count)
+        self.max_players = _int(max_players)
+
+RESPONSE_TYPES = {
+    'refreshlist': PlayerList,
+    'banlist': BanList,
+    'inspectall': InspectList,
+    'inspectteam': InspectList,
+    'inspectplayer': InspectList,
+    'serverinfo': ServerInfo,
+}
+
+def parse_response(command, raw):
+    """Parse a raw reply once into the typed result for ``command``."""
+    response_type = RESPONSE_TYPES.get(command.split(' ', 1)[0].lower(), RconResponse)
+    return response_type(command, raw)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+from ban_store import ban_store
+from fanout import fan_out, fan_out_each
+from rcon_pool import servers
+from command_outbox import outbox
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+reconcile_interval = config.get("reconcile_interval", 900)
+reconcile_batch_size = config.get("reconcile_batch_size", 50)
+lifted_retention_days = config.get("lifted_retention_days", 30)
+
+class ServerDrift:
+    __slots__ = ("server_name", "missing", "extra", "applied", "error", "checked_at")
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        self.missing = []
+        self.extra = []
+        self.applied = 0
+        self.error = None
+        self.checked_at = time.time()
+
+    @property
+    def in_sync(self):
+        return self.error is None and not self.missing and not self.extra
+
+class BanReconciler:
+    """Brings every server's own ban list in line with the ban store.
+
+    Each pass reads ``banlist`` from all servers at once and diffs it against
+    the store. Missing bans are sent; server bans for players the store has
+    lifted are undone. Bans the bot never issued are left alone. At most
+    ``batch_size`` commands go to a server per pass, the rest wait for the
+    next one, and the per-server outcome is kept in ``drift``. Servers with
+    commands still waiting in the outbox are skipped until it has drained.
+    """
+
+    def __init__(self, store, servers, interval=900, batch_size=50, retention_days=30):
+        self.store = store
+        self.servers = servers
+        self.interval = interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.drift = {}
+        self.last_run = None
+        self._lock = asyncio.Lock()
+
+    async def reconcile(self, on_result=None):
+        async with self._lock:
+            self.store.prune_lifted(time.time() - self.retention_days * 86400)
+            pending = outbox.counts()
+            report = await fan_out([server_name for server_name in self.servers if server_name not in pending], "banlist", on_result=on_result)
+
+            wanted = set(self.store.bans)
+            lifted = self.store.lifted()
+            drift = {}
+            commands_by_server = {}
+            for result in report.results:
+                server_drift = drift[result.server_name] = ServerDrift(result.server_name)
+                response = result.commands[0].response
+                if not result.ok or not isinstance(response.raw, dict):
+                    server_drift.error = result.error or "unexpected banlist response"
+                    continue
+
+                server_bans = response.bans
+                server_drift.missing = sorted(wanted - server_bans)
+                server_drift.extra = sorted(server_bans & lifted)
+                commands = [f"ban {username}" for username in server_drift.missing]
+                commands += [f"unban {username}" for username in server_drift.extra]
+                if commands:
+                    commands_by_server[result.server_name] = commands[:self.batch_size]
+
+            if commands_by_server:
+                apply_report = await fan_out_each(commands_by_server)
+                for result in apply_report.results:
+                    server_drift = drift[result.server_name]
+                    server_drift.applied = sum(1 for command_result in result.commands if command_result.ok)
+                    if not result.ok:
+                        server_drift.error = result.error
+
+            for server_name in pending:
+                if server_name in self.servers:
+                    drift[server_name] = ServerDrift(server_name)
+                    drift[server_name].error = f"{pending[server_name]} commands waiting in the outbox"
+
+            self.drift = drift
+            self.last_run = time.time()
+            return drift
+
+    async def run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"Ban reconciliation failed: {e}")
+            await asyncio.sleep(self.interval)
+
+reconciler = BanReconciler(ban_store, servers, interval=reconcile_interval, batch_size=reconcile_batch_size, retention_days=lifted_retention_days)
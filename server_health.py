@@ -0,0 +1,86 @@
+import json
+import time
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+circuit_failure_threshold = config.get("circuit_failure_threshold", 3)
+circuit_reset_timeout = config.get("circuit_reset_timeout", 30)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+class CircuitOpenError(Exception):
+    pass
+
+class ServerHealth:
+    __slots__ = ("server_name", "state", "failures", "opened_at", "last_error", "last_success", "last_failure")
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.last_success = None
+        self.last_failure = None
+
+class HealthTracker:
+    """Per-server circuit breaker for RCON traffic.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately with ``CircuitOpenError``. Once ``reset_timeout``
+    seconds have passed a single probe is let through (half-open); success
+    closes the circuit and notifies ``listeners`` so queued work can resume.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.servers = {}
+        self.listeners = []
+
+    def get(self, server_name):
+        health = self.servers.get(server_name)
+        if health is None:
+            health = self.servers[server_name] = ServerHealth(server_name)
+        return health
+
+    def is_available(self, server_name):
+        health = self.get(server_name)
+        return health.state == CLOSED or (health.state == OPEN and time.monotonic() - health.opened_at >= self.reset_timeout)
+
+    def check(self, server_name):
+        health = self.get(server_name)
+        if health.state == CLOSED:
+            return
+        if health.state == OPEN and time.monotonic() - health.opened_at >= self.reset_timeout:
+            health.state = HALF_OPEN
+            return
+        raise CircuitOpenError(f"{server_name} is unreachable ({health.last_error}); not retrying for now")
+
+    def record_success(self, server_name):
+        health = self.get(server_name)
+        recovered = health.state != CLOSED
+        health.state = CLOSED
+        health.failures = 0
+        health.last_success = time.time()
+        if recovered:
+            print(f"{server_name} is reachable again")
+            for listener in self.listeners:
+                listener(server_name)
+
+    def record_failure(self, server_name, error):
+        health = self.get(server_name)
+        health.failures += 1
+        health.last_error = str(error) or type(error).__name__
+        health.last_failure = time.time()
+        if health.state == HALF_OPEN or health.failures >= self.failure_threshold:
+            if health.state != OPEN:
+                print(f"{server_name} marked unreachable after {health.failures} failures: {health.last_error}")
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+
+health = HealthTracker(failure_threshold=circuit_failure_threshold, reset_timeout=circuit_reset_timeout)
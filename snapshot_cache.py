@@ -0,0 +1,60 @@
+import asyncio
+import json
+import time
+from rcon_pool import servers, send_pavlov_command
+from rcon_types import PlayerList
+from name_index import OnlinePlayers
+
+# Load configuration
+with open('config.json') as config_file:
+    config = json.load(config_file)
+
+snapshot_ttl = config.get("snapshot_ttl", 5)
+
+class SnapshotCache:
+    """Short-lived per-server cache of read-only RCON command results.
+
+    A result younger than ``ttl`` is returned straight from memory. Otherwise
+    concurrent callers asking for the same server and command share a single
+    in-flight RCON call. Failed calls (``None``) are not cached. Every player
+    list that passes through also updates ``online``.
+    """
+
+    def __init__(self, servers, ttl=5):
+        self.servers = servers
+        self.ttl = ttl
+        self.online = OnlinePlayers()
+        self._entries = {}
+        self._inflight = {}
+
+    async def _fetch(self, server_name, command):
+        server_details = self.servers[server_name]
+        response = await send_pavlov_command(server_details['ip'], server_details['port'], server_details['password'], command)
+        if response is not None:
+            self.put(server_name, command, response)
+        return response
+
+    async def get(self, server_name, command, ttl=None):
+        key = (server_name, command)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < (self.ttl if ttl is None else ttl):
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._fetch(server_name, command))
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+        # Shielded so one caller timing out does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def put(self, server_name, command, response):
+        self._entries[(server_name, command)] = (time.monotonic(), response)
+        if isinstance(response, PlayerList) or command == "InspectAll":
+            self.online.update(server_name, (player.username for player in response.players if player.username))
+
+    def peek(self, server_name, command):
+        """Return the last result regardless of age, or ``None``."""
+        entry = self._entries.get((server_name, command))
+        return entry[1] if entry is not None else None
+
+snapshot_cache = SnapshotCache(servers, ttl=snapshot_ttl)
@@ -0,0 +1,50 @@
+class StatsIngest:
+    """Turns cumulative in-match counters into per-poll deltas.
+
+    The last snapshot is kept per server and player. A map change starts every
+    player on that server from zero again, and a counter that went down (a
+    reconnect) counts the new value from zero. The first snapshot of a server
+    only sets the baseline, so restarting the bot mid-match never counts the
+    same kills twice.
+    """
+
+    def __init__(self):
+        self.snapshots = {}
+
+    def forget(self, server_name):
+        self.snapshots.pop(server_name, None)
+
+    def ingest(self, server_name, map_label, players):
+        """Return ``[(username, kills_delta, deaths_delta), ...]`` for one poll.
+
+        ``players`` are the ``InspectedPlayer`` results of an InspectAll.
+        """
+        previous = self.snapshots.get(server_name)
+        first_seen = previous is None
+        if first_seen or previous[0] != map_label:
+            baseline = {}
+        else:
+            baseline = previous[1]
+
+        # Players who left keep their baseline until the map changes, in case they rejoin
+        current = dict(baseline)
+        deltas = []
+        for player in players:
+            username = player.username
+            if not username:
+                continue
+            key = player.unique_id or username
+            kills, deaths = player.kills, player.deaths
+            current[key] = (kills, deaths)
+            if first_seen:
+                continue
+
+            last_kills, last_deaths = baseline.get(key, (0, 0))
+            if kills < last_kills or deaths < last_deaths:
+                # Counters were reset under us, e.g. the player reconnected
+                last_kills, last_deaths = 0, 0
+            if kills != last_kills or deaths != last_deaths:
+                deltas.append((username, kills - last_kills, deaths - last_deaths))
+
+        self.snapshots[server_name] = (map_label, current)
+        return deltas
@@ -0,0 +1,90 @@
+import asyncio
+import math
+import random
+import time
+from metrics import metrics
+
+LIVE = 'live'
+EMPTY = 'empty'
+OFFLINE = 'offline'
+
+class ServerPollState:
+    __slots__ = ("server_name", "state", "interval", "lag", "last_poll", "last_duration", "failures")
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        self.state = None
+        self.interval = 0.0
+        self.lag = 0.0
+        self.last_poll = None
+        self.last_duration = 0.0
+        self.failures = 0
+
+class StatsPoller:
+    """Polls every server on its own task, at a rate that follows the server.
+
+    ``poll`` is a coroutine ``poll(server_name, server_details)`` returning the
+    number of players in the match, or ``None`` if the server could not be
+    reached. Live servers are polled every ``live_interval``, empty ones every
+    ``idle_interval``; offline servers back off exponentially up to
+    ``offline_interval``. Deadlines are fixed-rate with jitter, so a slow
+    server never delays another and ``lag`` shows how late each poll started.
+    """
+
+    def __init__(self, servers, poll, live_interval=60, idle_interval=300, offline_interval=600, jitter=0.1):
+        self.servers = servers
+        self.poll = poll
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.offline_interval = offline_interval
+        self.jitter = jitter
+        self.states = {server_name: ServerPollState(server_name) for server_name in servers}
+        self._tasks = []
+
+    def _next_interval(self, state):
+        if state.state == LIVE:
+            interval = self.live_interval
+        elif state.state == EMPTY:
+            interval = self.idle_interval
+        else:
+            interval = min(self.live_interval * 2 ** state.failures, self.offline_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _run_server(self, server_name):
+        state = self.states[server_name]
+        # Spread the first polls out so the fleet is not hit all at once
+        due = time.monotonic() + random.uniform(0, self.live_interval)
+        while True:
+            await asyncio.sleep(max(0, due - time.monotonic()))
+            started = time.monotonic()
+            state.lag = started - due
+
+            try:
+                player_count = await self.poll(server_name, self.servers[server_name])
+            except Exception as e:
+                print(f"Stats poll of {server_name} failed: {e}")
+                player_count = None
+
+            if player_count is None:
+                state.state = OFFLINE
+                state.failures += 1
+            else:
+                state.state = LIVE if player_count > 0 else EMPTY
+                state.failures = 0
+            state.last_poll = time.time()
+            state.last_duration = time.monotonic() - started
+            metrics.set("pavlov_stats_poll_lag_seconds", state.lag, {"server": server_name})
+            metrics.observe("pavlov_stats_poll_seconds", state.last_duration, {"server": server_name})
+
+            if state.interval and state.lag > state.interval:
+                print(f"Stats poller is falling behind on {server_name}: {state.lag:.1f}s late")
+            state.interval = self._next_interval(state)
+            due += state.interval
+            now = time.monotonic()
+            if due < now:
+                # Missed slots are dropped rather than run back to back
+                due += state.interval * math.ceil((now - due) / state.interval)
+
+    async def run(self):
+        self._tasks = [asyncio.create_task(self._run_server(server_name)) for server_name in self.servers]
+        await asyncio.gather(*self._tasks)
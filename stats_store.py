@@ -0,0 +1,150 @@
+import json
+import os
+from array import array
+
+def kd_ratio(kills, deaths):
+    return kills / deaths if deaths > 0 else kills
+
+class StatsStore:
+    """Compact, persistent Kills/Deaths totals for every player ever seen.
+
+    Players get a dense integer id; totals live in two ``array('q')`` columns,
+    so each player costs 16 bytes plus its name. KD is derived on read.
+    Every change is appended to a write-ahead log; once the log holds
+    ``wal_max`` records the arrays are written to a snapshot and the log is
+    truncated, which bounds the replay on restart. Each snapshot bumps a
+    generation number that also heads the new log, so a log left behind by a
+    crash between the two steps is recognised as already covered and skipped.
+    """
+
+    def __init__(self, path, wal_max=10000):
+        self.snapshot_path = f"{path}.snapshot"
+        self.wal_path = f"{path}.wal"
+        self.wal_max = wal_max
+        self.names = []
+        self.ids = {}
+        self.kills = array('q')
+        self.deaths = array('q')
+        self.generation = 0
+        self._wal = None
+        self._wal_records = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, username):
+        return username in self.ids
+
+    def player_id(self, username):
+        player_id = self.ids.get(username)
+        if player_id is None:
+            player_id = self.ids[username] = len(self.names)
+            self.names.append(username)
+            self.kills.append(0)
+            self.deaths.append(0)
+        return player_id
+
+    def kd(self, player_id):
+        return kd_ratio(self.kills[player_id], self.deaths[player_id])
+
+    def get(self, username):
+        player_id = self.ids.get(username)
+        if player_id is None:
+            return None
+        return {"Kills": self.kills[player_id], "Deaths": self.deaths[player_id], "KD": self.kd(player_id)}
+
+    def _apply(self, username, kills, deaths):
+        player_id = self.ids.get(username)
+        if player_id is None:
+            player_id, old = self.player_id(username), None
+        else:
+            old = (self.kills[player_id], self.deaths[player_id])
+        self.kills[player_id] += kills
+        self.deaths[player_id] += deaths
+        return player_id, old
+
+    def record(self, username, kills, deaths):
+        """Add a delta and log it; return ``(player_id, (old_kills, old_deaths))``.
+
+        The old totals are ``None`` for a player seen for the first time.
+        """
+        result = self._apply(username, kills, deaths)
+        self._wal.write(json.dumps([username, kills, deaths]) + "\n")
+        self._wal_records += 1
+        if self._wal_records >= self.wal_max:
+            self.snapshot()
+        return result
+
+    def flush(self):
+        if self._wal is not None:
+            self._wal.flush()
+
+    def load(self):
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                header = json.loads(f.readline())
+                self.generation = header.get("generation", 0)
+                self.names = json.loads(f.readline())
+                self.ids = {username: player_id for player_id, username in enumerate(self.names)}
+                self.kills = array('q')
+                self.kills.frombytes(f.read(header["count"] * self.kills.itemsize))
+                self.deaths = array('q')
+                self.deaths.frombytes(f.read(header["count"] * self.deaths.itemsize))
+
+        replayed, torn, stale = 0, False, False
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        if isinstance(record, dict):
+                            # Logs written before generations existed have no header and count as 0
+                            stale = record.get("generation", 0) < self.generation
+                            continue
+                        if stale:
+                            # Already in the snapshot; the crash came before the log was truncated
+                            continue
+                        username, kills, deaths = record
+                    except (json.JSONDecodeError, ValueError):
+                        # A torn last line from a crash mid-write
+                        torn = True
+                        continue
+                    self._apply(username, kills, deaths)
+                    replayed += 1
+        if torn:
+            # Start a clean log rather than appending after the partial line
+            self.snapshot()
+        elif stale or not os.path.exists(self.wal_path):
+            self._start_wal()
+        else:
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+            self._wal_records = replayed
+        print(f"Loaded stats for {len(self.names)} players ({replayed} log records replayed)")
+
+    def _start_wal(self):
+        if self._wal is not None:
+            self._wal.close()
+        self._wal = open(self.wal_path, 'w', encoding='utf-8')
+        self._wal.write(json.dumps({"generation": self.generation}) + "\n")
+        self._wal.flush()
+        self._wal_records = 0
+
+    def snapshot(self):
+        generation = self.generation + 1
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps({"version": 2, "count": len(self.names), "generation": generation}).encode('utf-8') + b"\n")
+            f.write(json.dumps(self.names).encode('utf-8') + b"\n")
+            f.write(self.kills.tobytes())
+            f.write(self.deaths.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self.generation = generation
+        self._start_wal()
+
+    def close(self):
+        if self._wal is not None:
+            self.snapshot()
+            self._wal.close()
+            self._wal = None